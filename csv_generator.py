@@ -5,7 +5,10 @@ Generates CSV files matching the 41-column template format.
 
 import csv
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -58,8 +61,26 @@ CUSTOMER_GSTIN_MAP = {
     "27AACCN5739J2Z3": "ISD"
 }
 
+
+# GSTIN -> branch, memoised (only a handful of distinct GSTINs per batch)
+@lru_cache(maxsize=2048)
+def _customer_branch(gstin: str) -> str:
+    """Branch for a customer GSTIN, falling back to its state code."""
+    if not gstin:
+        return ""
+    return CUSTOMER_GSTIN_MAP.get(gstin) or STATE_TO_BRANCH.get(gstin[:2], "")
+
+
+@lru_cache(maxsize=2048)
+def _vendor_branch(gstin: str) -> str:
+    """Organization branch for a vendor GSTIN, falling back to its state code."""
+    if not gstin:
+        return ""
+    return VENDOR_GSTIN_MAP.get(gstin) or STATE_TO_BRANCH.get(gstin[:2], "")
+
+
 # 41 CSV Headers matching the template
-CSV_HEADERS = [
+CSV_HEADERS = (
     "Entry Date",           # 1
     "Posting Date",         # 2
     "Organization",         # 3
@@ -101,7 +122,14 @@ CSV_HEADERS = [
     "WH Tax Amount",        # 39
     "Round Off",            # 40
     "CC Code",              # 41
-]
+)
+assert len(CSV_HEADERS) == 41
+
+# Write buffer for CSV output files (rows are flushed in one writerows() call)
+CSV_WRITE_BUFFER = 1 << 20
+
+# Maximum number of group CSV files written concurrently
+CSV_WRITE_WORKERS = 8
 
 
 def get_current_date_formatted() -> str:
@@ -109,6 +137,7 @@ def get_current_date_formatted() -> str:
     return datetime.now().strftime("%d-%b-%Y") # Title Case
 
 
+@lru_cache(maxsize=64)
 def map_airline_to_organization(airline: str) -> str:
     """Map airline name to organization name for the template."""
     airline_upper = airline.upper()
@@ -125,18 +154,12 @@ def map_airline_to_organization(airline: str) -> str:
     return airline_upper
 
 
-def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str = "") -> str:
-    """Generate narration text for the CSV."""
-    org = map_airline_to_organization(airline)
-    
-    if routing:
-        route_text = routing.replace(" TO ", " TO ")
-    else:
-        route_text = ""
-    
+@lru_cache(maxsize=1024)
+def _build_narration(org: str, routing: str, pnr: str = "", passenger: str = "") -> str:
+    """Build narration text from an already mapped organization name."""
     narration = f"BEING AMOUNT PAYABLE TO {org}"
-    if route_text:
-        narration += f" FROM {route_text}"
+    if routing:
+        narration += f" FROM {routing}"
     if pnr:
         narration += f" PNR:{pnr}"
     if passenger:
@@ -145,53 +168,110 @@ def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str
     return narration
 
 
-def invoice_to_csv_row(
+def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str = "") -> str:
+    """Generate narration text for the CSV."""
+    return _build_narration(map_airline_to_organization(airline), routing, pnr, passenger)
+
+
+def _row_template(is_non_taxable: bool) -> tuple:
+    """Build the constant columns of a CSV row; per-invoice columns are left blank."""
+    row = dict.fromkeys(CSV_HEADERS, "")
+    row["ExchRate"] = "1"
+    row["Charge or GL"] = "TRAVELLING EXPENSES"
+    row["Charge or GL Name"] = "TRAVELLING EXPENSES"
+    row["Tax Type"] = "Non-Taxable" if is_non_taxable else "Taxable"
+    row["SAC or HSN"] = "" if is_non_taxable else "996425"  # Air Transport, taxable only
+    row["Avail Tax Credit"] = "No" if is_non_taxable else "Yes"
+    row["Round Off"] = "Yes"
+    return tuple(row.values())
+
+
+# Constant row templates, built once at import
+_TAXABLE_TEMPLATE = _row_template(False)
+_NONTAXABLE_TEMPLATE = _row_template(True)
+
+# Positions of the per-invoice columns, in the order _build_row supplies them
+_VARIABLE_COLS = tuple(CSV_HEADERS.index(h) for h in (
+    "Entry Date", "Posting Date", "Organization", "Organization Branch",
+    "Vendor Inv No", "Vendor Inv Date", "Currency", "Narration", "Due Date",
+    "Charge or GL Amount", "DR or CR", "Branch", "TaxGroup",
+    "Taxcode1", "Taxcode1 Amt", "Taxcode2", "Taxcode2 Amt", "Amount",
+))
+
+
+def _build_row(
+    invoice: InvoiceData,
+    entry_date: str,
+    is_non_taxable: bool,
+    amount: float,
+    branch: str,
+    organization: str,
+    org_branch: str,
+    dr_cr: str,
+    narration: str,
+    taxcode1: str,
+    taxcode1_amt: str,
+    taxcode2: str,
+    taxcode2_amt: str,
+) -> tuple:
+    """Assemble a CSV row as a tuple in CSV_HEADERS order."""
+    row = list(_NONTAXABLE_TEMPLATE if is_non_taxable else _TAXABLE_TEMPLATE)
+    values = (
+        entry_date,
+        entry_date,
+        organization,
+        org_branch,
+        invoice.invoice_number,
+        invoice.invoice_date,
+        invoice.currency,
+        narration,
+        entry_date,
+        str(amount),
+        dr_cr,
+        branch,
+        "GSTIN" if invoice.customer_gstin and not is_non_taxable else "",
+        taxcode1,
+        taxcode1_amt,
+        taxcode2,
+        taxcode2_amt,
+        str(invoice.total_amount),  # Amount (total for the invoice)
+    )
+    for col, value in zip(_VARIABLE_COLS, values):
+        row[col] = value
+    return tuple(row)
+
+
+def invoice_to_csv_tuple(
     invoice: InvoiceData, 
-    entry_date: Optional[str] = None,
+    entry_date: str,
     is_non_taxable: bool = False,
     charge_amount: Optional[float] = None
-) -> Dict[str, Any]:
-    """Convert InvoiceData to a CSV row dictionary.
+) -> tuple:
+    """Convert InvoiceData to a CSV row tuple (values in CSV_HEADERS order).
     
     Args:
         invoice: InvoiceData object
-        entry_date: Entry date in DD-MMM-YYYY format
+        entry_date: Entry date in DD-MMM-YYYY format (computed once per batch by the caller)
         is_non_taxable: If True, creates a non-taxable entry (for airport charges)
         charge_amount: Override for charge amount (used for split entries)
     """
     
-    if entry_date is None:
-        entry_date = get_current_date_formatted()
-    
-    # Determine Branch (Customer GSTIN based)
-    branch = ""
-    if invoice.customer_gstin:
-        branch = CUSTOMER_GSTIN_MAP.get(invoice.customer_gstin)
-        if not branch:
-            # Fallback to state code map
-            state_code = invoice.customer_gstin[:2]
-            branch = STATE_TO_BRANCH.get(state_code, "")
-            
+    # Determine Branch (Customer GSTIN based, then extracted state code)
+    branch = _customer_branch(invoice.customer_gstin)
     if not branch and invoice.state_code:
         branch = STATE_TO_BRANCH.get(invoice.state_code, "GUJARAT")
-    if not branch:
-        branch = "GUJARAT"
+    branch = branch or "GUJARAT"
 
     # Determine Organization Branch (Vendor GSTIN based)
-    org_branch = ""
-    if invoice.vendor_gstin:
-        org_branch = VENDOR_GSTIN_MAP.get(invoice.vendor_gstin)
-        if not org_branch:
-             # Fallback to state logic if extracted
-             state_code = invoice.vendor_gstin[:2]
-             org_branch = STATE_TO_BRANCH.get(state_code, "")
+    org_branch = _vendor_branch(invoice.vendor_gstin)
     
     # Determine DR or CR based on invoice type
     dr_cr = "Dr" if invoice.invoice_type == "TAX_INVOICE" else "Cr"
     
     # Generate narration
-    narration = generate_narration(
-        invoice.airline,
+    organization = map_airline_to_organization(invoice.airline)
+    narration = _build_narration(
+        organization,
         invoice.routing,
         invoice.pnr,
         invoice.passenger_name
@@ -210,8 +290,6 @@ def invoice_to_csv_row(
     taxcode1_amt = ""
     taxcode2 = ""
     taxcode2_amt = ""
-    taxcode3 = ""
-    taxcode3_amt = ""
     
     if not is_non_taxable:
         if invoice.igst_amount > 0:
@@ -228,57 +306,30 @@ def invoice_to_csv_row(
             taxcode1 = "SGST"
             taxcode1_amt = str(invoice.sgst_amount)
     
-    # Build the row
-    row = {
-        "Entry Date": entry_date,
-        "Posting Date": entry_date,
-        "Organization": map_airline_to_organization(invoice.airline),
-        "Organization Branch": org_branch,
-        "Vendor Inv No": invoice.invoice_number,
-        "Vendor Inv Date": invoice.invoice_date,
-        "Currency": invoice.currency,
-        "ExchRate": "1",
-        "Narration": narration,
-        "Due Date": entry_date,
-        "Charge or GL": "TRAVELLING EXPENSES",
-        "Charge or GL Name": "TRAVELLING EXPENSES",
-        "Charge or GL Amount": str(amount),
-        "DR or CR": dr_cr,
-        "Cost Center": "",
-        "Branch": branch,
-        " Charge Narration": "",
-        "TaxGroup": "GSTIN" if invoice.customer_gstin and not is_non_taxable else "",
-        "Tax Type": "Non-Taxable" if is_non_taxable else "Taxable",
-        "SAC or HSN": "996425" if not is_non_taxable else "",  # Air Transport SAC code only for taxable
-        "Taxcode1": taxcode1,
-        "Taxcode1 Amt": taxcode1_amt,
-        "Taxcode2": taxcode2,
-        "Taxcode2 Amt": taxcode2_amt,
-        "Taxcode3": taxcode3,
-        "Taxcode3 Amt": taxcode3_amt,
-        "Taxcode4": "",
-        "Taxcode4 Amt": "",
-        "Avail Tax Credit": "Yes" if not is_non_taxable else "No",
-        "LOB": "",
-        "Ref Type": "",
-        "Ref No": "",
-        "Amount": str(invoice.total_amount),  # Total amount for the invoice
-        "Start Date": "",
-        "End Date": "",
-        "WH Tax Code": "",
-        "WH Tax Percentage": "",
-        "WH Tax Taxable": "",
-        "WH Tax Amount": "",
-        "Round Off": "Yes",
-        "CC Code": "",
-    }
-    
-    return row
+    return _build_row(
+        invoice, entry_date, is_non_taxable, amount, branch, organization, org_branch, dr_cr,
+        narration, taxcode1, taxcode1_amt, taxcode2, taxcode2_amt
+    )
 
 
-def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+def invoice_to_csv_row(
+    invoice: InvoiceData, 
+    entry_date: Optional[str] = None,
+    is_non_taxable: bool = False,
+    charge_amount: Optional[float] = None
+) -> Dict[str, Any]:
+    """Convert InvoiceData to a CSV row dictionary keyed by CSV_HEADERS.
+    
+    Thin wrapper around invoice_to_csv_tuple for callers that want named columns.
     """
-    Convert InvoiceData to one or more CSV row dictionaries.
+    if entry_date is None:
+        entry_date = get_current_date_formatted()
+    return dict(zip(CSV_HEADERS, invoice_to_csv_tuple(invoice, entry_date, is_non_taxable, charge_amount)))
+
+
+def invoice_to_csv_tuples(invoice: InvoiceData, entry_date: str) -> List[tuple]:
+    """
+    Convert InvoiceData to one or more CSV row tuples.
     Creates separate rows for taxable and non-taxable amounts (e.g., Akasa airport charges).
     
     Args:
@@ -286,40 +337,88 @@ def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None)
         entry_date: Entry date in DD-MMM-YYYY format
         
     Returns:
-        List of row dictionaries
+        List of row tuples in CSV_HEADERS order
     """
-    if entry_date is None:
-        entry_date = get_current_date_formatted()
-    
     rows = []
     
     # Main taxable entry
     if invoice.taxable_value > 0:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     elif invoice.total_amount > 0 and invoice.non_taxable_value == 0:
         # No taxable value but has total - use total as taxable
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     
     # Non-taxable entry (airport charges, etc.) - separate row with same invoice number
     if invoice.non_taxable_value > 0:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=True))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=True))
     
     # If no rows created (edge case), create at least one
     if not rows:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     
     return rows
 
 
+def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Convert InvoiceData to one or more CSV row dictionaries.
+    Dict-based counterpart of invoice_to_csv_tuples.
+    
+    Args:
+        invoice: InvoiceData object
+        entry_date: Entry date in DD-MMM-YYYY format
+        
+    Returns:
+        List of row dictionaries
+    """
+    if entry_date is None:
+        entry_date = get_current_date_formatted()
+    return [dict(zip(CSV_HEADERS, row)) for row in invoice_to_csv_tuples(invoice, entry_date)]
+
+
 def group_invoices_by_gstin(invoices: List[InvoiceData]) -> Dict[str, List[InvoiceData]]:
     """Group invoices by customer GSTIN for separate output files."""
-    groups = {}
+    groups = defaultdict(list)
     for inv in invoices:
-        key = inv.customer_gstin if inv.customer_gstin else "UNKNOWN"
-        if key not in groups:
-            groups[key] = []
-        groups[key].append(inv)
-    return groups
+        groups[inv.customer_gstin or "UNKNOWN"].append(inv)
+    # Plain dict so lookups of missing GSTINs don't silently add empty groups
+    return dict(groups)
+
+
+def _group_filename(gstin: str, filename_prefix: str, timestamp: str) -> str:
+    """Output filename for one customer-GSTIN group."""
+    # Get state name for filename
+    if gstin != "UNKNOWN" and gstin != "all" and len(gstin) >= 2:
+        state = STATE_TO_BRANCH.get(gstin[:2], "Unknown")
+    else:
+        state = "Unknown"
+    
+    return f"{filename_prefix}_{state}_{gstin}_{timestamp}.csv"
+
+
+def _write_group_csv(
+    gstin: str,
+    inv_list: List[InvoiceData],
+    output_dir: str,
+    filename_prefix: str,
+    entry_date: str,
+    timestamp: str
+) -> str:
+    """Write one customer-GSTIN group to its own CSV file and return the path."""
+    filepath = os.path.join(output_dir, _group_filename(gstin, filename_prefix, timestamp))
+    
+    # Write CSV
+    with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        
+        rows = []
+        for inv in inv_list:
+            # Get all rows (may be multiple for taxable + non-taxable split)
+            rows.extend(invoice_to_csv_tuples(inv, entry_date))
+        writer.writerows(rows)
+    
+    return filepath
 
 
 def generate_csv(
@@ -341,46 +440,97 @@ def generate_csv(
         List of generated file paths
     """
     os.makedirs(output_dir, exist_ok=True)
-    generated_files = []
+    
+    # Skip failed extractions before grouping
+    invoices = [inv for inv in invoices if inv.invoice_number or not inv.extraction_errors]
     
     if group_by_gstin:
         groups = group_invoices_by_gstin(invoices)
     else:
         groups = {"all": invoices}
+    if not groups:
+        return []
     
     entry_date = get_current_date_formatted()
+    # Shared by every file in the batch, also avoids overwriting earlier runs
+    timestamp = datetime.now().strftime("%d%b%Y_%H%M").upper()
     
-    for gstin, inv_list in groups.items():
-        # Get state name for filename
-        if gstin != "UNKNOWN" and gstin != "all" and len(gstin) >= 2:
-            state = STATE_TO_BRANCH.get(gstin[:2], "Unknown")
-        else:
-            state = "Unknown"
-        
-        # Create filename with timestamp to avoid overwriting
-        timestamp = datetime.now().strftime("%d%b%Y_%H%M").upper()
-        filename = f"{filename_prefix}_{state}_{gstin}_{timestamp}.csv"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Write CSV
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-            writer.writeheader()
-            
-            for inv in inv_list:
-                if inv.extraction_errors and not inv.invoice_number:
-                    continue  # Skip failed extractions
-                # Get all rows (may be multiple for taxable + non-taxable split)
-                rows = invoice_to_csv_rows(inv, entry_date)
-                for row in rows:
-                    writer.writerow(row)
-        
-        generated_files.append(filepath)
+    # Group files are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=min(CSV_WRITE_WORKERS, len(groups))) as pool:
+        generated_files = list(pool.map(
+            lambda item: _write_group_csv(*item, output_dir, filename_prefix, entry_date, timestamp),
+            groups.items()
+        ))
+    
+    for filepath, inv_list in zip(generated_files, groups.values()):
         print(f"Generated: {filepath} ({len(inv_list)} invoice(s))")
     
     return generated_files
 
 
+class StreamingCsvWriter:
+    """
+    Write invoices to per-GSTIN CSV files as they arrive.
+    
+    Streaming counterpart of generate_csv for callers that produce invoices one
+    at a time: each group's file is opened on its first invoice and rows are
+    written immediately, so parsed invoices don't have to be held until the end.
+    
+    Usage:
+        with StreamingCsvWriter(output_dir) as csv_writer:
+            for invoice in invoices:
+                csv_writer.write(invoice)
+        generated_files = csv_writer.close()
+    """
+    
+    def __init__(
+        self,
+        output_dir: str,
+        group_by_gstin: bool = True,
+        filename_prefix: str = "transport_expenses"
+    ):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.group_by_gstin = group_by_gstin
+        self.filename_prefix = filename_prefix
+        self.entry_date = get_current_date_formatted()
+        self.timestamp = datetime.now().strftime("%d%b%Y_%H%M").upper()
+        self._groups = {}  # group key -> [file, csv writer, path, invoice count]
+        self._generated_files: List[str] = []
+    
+    def write(self, invoice: InvoiceData) -> None:
+        """Append one invoice's rows to its group file."""
+        if invoice.extraction_errors and not invoice.invoice_number:
+            return  # Skip failed extractions
+        
+        key = (invoice.customer_gstin or "UNKNOWN") if self.group_by_gstin else "all"
+        group = self._groups.get(key)
+        if group is None:
+            filepath = os.path.join(self.output_dir, _group_filename(key, self.filename_prefix, self.timestamp))
+            f = open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER)
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADERS)
+            group = self._groups[key] = [f, writer, filepath, 0]
+        
+        group[1].writerows(invoice_to_csv_tuples(invoice, self.entry_date))
+        group[3] += 1
+    
+    def close(self) -> List[str]:
+        """Close all open files and return their paths (safe to call more than once)."""
+        for f, _, filepath, count in self._groups.values():
+            f.close()
+            self._generated_files.append(filepath)
+            print(f"Generated: {filepath} ({count} invoice(s))")
+        self._groups.clear()
+        return list(self._generated_files)
+    
+    def __enter__(self) -> "StreamingCsvWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 def generate_single_csv(
     invoices: List[InvoiceData],
     output_path: str
@@ -398,17 +548,18 @@ def generate_single_csv(
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     entry_date = get_current_date_formatted()
     
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writeheader()
+    # Skip failed extractions
+    invoices = [inv for inv in invoices if inv.invoice_number or not inv.extraction_errors]
+    
+    with open(output_path, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
         
+        rows = []
         for inv in invoices:
-            if inv.extraction_errors and not inv.invoice_number:
-                continue  # Skip failed extractions
             # Get all rows (may be multiple for taxable + non-taxable split)
-            rows = invoice_to_csv_rows(inv, entry_date)
-            for row in rows:
-                writer.writerow(row)
+            rows.extend(invoice_to_csv_tuples(inv, entry_date))
+        writer.writerows(rows)
     
     print(f"Generated: {output_path} ({len(invoices)} invoice(s))")
     return output_path
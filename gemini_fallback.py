@@ -5,7 +5,10 @@ Uses Google Gemini API for invoice extraction when regex fails.
 
 import os
 import json
-from typing import Optional
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, List, Tuple
 from dataclasses import asdict
 
 # Try to load environment variables
@@ -15,6 +18,12 @@ try:
 except ImportError:
     pass
 
+# orjson is a faster drop-in for json.loads when available
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Import InvoiceData class
 try:
     from invoice_parser import InvoiceData, parse_date_to_standard, GSTIN_STATE_MAP
@@ -22,6 +31,41 @@ except ImportError:
     from .invoice_parser import InvoiceData, parse_date_to_standard, GSTIN_STATE_MAP
 
 
+# Cap on concurrent Gemini requests for batch extraction
+GEMINI_MAX_CONCURRENCY = 8
+
+# Gemini results are cached on disk so re-processing a PDF skips the API call
+GEMINI_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mmt_gemini")
+
+# Only this much of the PDF text is sent in the prompt (and used as the cache key)
+PROMPT_TEXT_LIMIT = 4000
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Bump when _build_prompt or the response mapping changes, so cached extractions expire
+# (the model id and INVOICE_SCHEMA are part of the cache key already)
+GEMINI_PROMPT_VERSION = 1
+
+_TEXT_FIELDS = (
+    "airline", "invoice_number", "invoice_date", "customer_name", "customer_gstin",
+    "place_of_supply", "state_code", "currency", "pnr", "passenger_name",
+    "flight_from", "flight_to",
+)
+_AMOUNT_FIELDS = (
+    "taxable_value", "non_taxable_value", "cgst_amount", "sgst_amount",
+    "igst_amount", "total_amount",
+)
+
+# Response schema for Gemini JSON mode (server returns bare JSON in this shape)
+INVOICE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        **{name: {"type": "STRING"} for name in _TEXT_FIELDS},
+        **{name: {"type": "NUMBER"} for name in _AMOUNT_FIELDS},
+    },
+}
+
+
 def get_gemini_api_key() -> Optional[str]:
     """Get Gemini API key from environment."""
     key = os.getenv("GEMINI_API_KEY")
@@ -31,34 +75,9 @@ def get_gemini_api_key() -> Optional[str]:
     return key
 
 
-def extract_with_gemini(pdf_text: str, invoice_type: str = "TAX_INVOICE") -> Optional[InvoiceData]:
-    """
-    Extract invoice data using Gemini API.
-    
-    Args:
-        pdf_text: Raw text extracted from PDF
-        invoice_type: Type of invoice (TAX_INVOICE or DEBIT)
-        
-    Returns:
-        InvoiceData object or None if extraction fails
-    """
-    api_key = get_gemini_api_key()
-    if not api_key:
-        print("Gemini API key not found in environment")
-        return None
-    
-    try:
-        import google.generativeai as genai
-    except ImportError:
-        print("google-generativeai package not installed. Install with: pip install google-generativeai")
-        return None
-    
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    # Create extraction prompt
-    prompt = f"""Extract the following information from this airline invoice text and return as JSON:
+def _build_prompt(pdf_text: str) -> str:
+    """Build the extraction prompt for one invoice's text."""
+    return f"""Extract the following information from this airline invoice text and return as JSON:
 
 {{
     "airline": "Name of the airline (Air India, IndiGo, Akasa Air, Gulf Air, Air India Express)",
@@ -82,66 +101,142 @@ def extract_with_gemini(pdf_text: str, invoice_type: str = "TAX_INVOICE") -> Opt
 }}
 
 Important:
-- Return ONLY valid JSON, no markdown or extra text
 - All amounts should be numbers without currency symbols or commas
 - Date should be in DD-MMM-YYYY format (e.g., 15-MAY-2025)
 - If a field is not found, use empty string for text or 0 for numbers
 
 Invoice Text:
-{pdf_text[:4000]}
+{pdf_text[:PROMPT_TEXT_LIMIT]}
 """
+
+
+# Shared model handle, set on the first successful _get_model() call
+_MODEL = None
+
+
+def _get_model():
+    """Configure the Gemini SDK once and return the shared model handle, or None if unavailable.
+    
+    Failures are not remembered, so a key set or SDK installed later is picked up.
+    """
+    global _MODEL
+    if _MODEL is not None:
+        return _MODEL
+    
+    api_key = get_gemini_api_key()
+    if not api_key:
+        print("Gemini API key not found in environment")
+        return None
     
     try:
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean up response if it has markdown code blocks
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1])
-        
-        # Parse JSON response
-        data_dict = json.loads(response_text)
-        
-        # Create InvoiceData object
-        invoice = InvoiceData(
-            airline=data_dict.get("airline", ""),
-            invoice_number=data_dict.get("invoice_number", ""),
-            invoice_date=data_dict.get("invoice_date", ""),
-            invoice_type=invoice_type,
-            customer_name=data_dict.get("customer_name", ""),
-            customer_gstin=data_dict.get("customer_gstin", ""),
-            place_of_supply=data_dict.get("place_of_supply", ""),
-            state_code=data_dict.get("state_code", ""),
-            currency=data_dict.get("currency", "INR"),
-            taxable_value=float(data_dict.get("taxable_value", 0) or 0),
-            non_taxable_value=float(data_dict.get("non_taxable_value", 0) or 0),
-            cgst_amount=float(data_dict.get("cgst_amount", 0) or 0),
-            sgst_amount=float(data_dict.get("sgst_amount", 0) or 0),
-            igst_amount=float(data_dict.get("igst_amount", 0) or 0),
-            total_amount=float(data_dict.get("total_amount", 0) or 0),
-            pnr=data_dict.get("pnr", ""),
-            passenger_name=data_dict.get("passenger_name", ""),
-            flight_from=data_dict.get("flight_from", ""),
-            flight_to=data_dict.get("flight_to", ""),
-        )
-        
-        # Set routing from flight codes
-        if invoice.flight_from and invoice.flight_to:
-            invoice.routing = f"{invoice.flight_from} TO {invoice.flight_to}"
-        elif invoice.flight_from:
-            invoice.routing = invoice.flight_from
-        
-        # Set CGST/SGST rates if amounts are present
-        if invoice.cgst_amount > 0:
-            invoice.cgst_rate = 2.5
-        if invoice.sgst_amount > 0:
-            invoice.sgst_rate = 2.5
-        if invoice.igst_amount > 0:
-            invoice.igst_rate = 5.0
-        
+        import google.generativeai as genai
+    except ImportError:
+        print("google-generativeai package not installed. Install with: pip install google-generativeai")
+        return None
+    
+    # Configure Gemini
+    genai.configure(api_key=api_key)
+    _MODEL = genai.GenerativeModel(
+        GEMINI_MODEL,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=INVOICE_SCHEMA,
+        ),
+    )
+    return _MODEL
+
+
+def _to_float(value: Any) -> float:
+    """Coerce a JSON amount to float, treating missing or malformed values as 0."""
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _invoice_from_response(response_text: str, invoice_type: str) -> InvoiceData:
+    """Build InvoiceData from Gemini's JSON response text."""
+    # JSON mode guarantees a bare object, no markdown fences to strip
+    data_dict = _json_loads(response_text)
+    
+    # Create InvoiceData object
+    invoice = InvoiceData(
+        airline=data_dict.get("airline", ""),
+        invoice_number=data_dict.get("invoice_number", ""),
+        invoice_date=data_dict.get("invoice_date", ""),
+        invoice_type=invoice_type,
+        customer_name=data_dict.get("customer_name", ""),
+        customer_gstin=data_dict.get("customer_gstin", ""),
+        place_of_supply=data_dict.get("place_of_supply", ""),
+        state_code=data_dict.get("state_code", ""),
+        currency=data_dict.get("currency", "INR"),
+        **{name: _to_float(data_dict.get(name)) for name in _AMOUNT_FIELDS},
+        pnr=data_dict.get("pnr", ""),
+        passenger_name=data_dict.get("passenger_name", ""),
+        flight_from=data_dict.get("flight_from", ""),
+        flight_to=data_dict.get("flight_to", ""),
+    )
+    
+    # Set routing from flight codes
+    if invoice.flight_from and invoice.flight_to:
+        invoice.routing = f"{invoice.flight_from} TO {invoice.flight_to}"
+    elif invoice.flight_from:
+        invoice.routing = invoice.flight_from
+    
+    # Set CGST/SGST rates if amounts are present
+    if invoice.cgst_amount > 0:
+        invoice.cgst_rate = 2.5
+    if invoice.sgst_amount > 0:
+        invoice.sgst_rate = 2.5
+    if invoice.igst_amount > 0:
+        invoice.igst_rate = 5.0
+    
+    return invoice
+
+
+def _cache_path(pdf_text: str, invoice_type: str) -> str:
+    """Cache file for a prompt input, keyed on the text actually sent and how it is extracted."""
+    h = hashlib.sha256()
+    h.update(f"{GEMINI_MODEL}:{GEMINI_PROMPT_VERSION}:{invoice_type}:".encode("utf-8"))
+    h.update(json.dumps(INVOICE_SCHEMA, sort_keys=True).encode("utf-8"))
+    h.update(pdf_text[:PROMPT_TEXT_LIMIT].encode("utf-8"))
+    return os.path.join(GEMINI_CACHE_DIR, f"{h.hexdigest()}.json")
+
+
+def _load_cached(path: str) -> Optional[InvoiceData]:
+    """Return a previously cached extraction, or None on a miss."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return InvoiceData(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _store_cached(path: str, invoice: InvoiceData) -> None:
+    """Save an extraction result; caching failures are not fatal."""
+    try:
+        os.makedirs(GEMINI_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=GEMINI_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(invoice), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not cache Gemini result: {e}")
+
+
+def _extract_with_model(model, pdf_text: str, invoice_type: str) -> Optional[InvoiceData]:
+    """Run one extraction request against an already configured model, using the disk cache."""
+    cache_path = _cache_path(pdf_text, invoice_type)
+    cached = _load_cached(cache_path)
+    if cached is not None:
+        return cached
+    
+    try:
+        response = model.generate_content(_build_prompt(pdf_text))
+        invoice = _invoice_from_response(response.text, invoice_type)
+        if invoice.invoice_number:
+            _store_cached(cache_path, invoice)
         return invoice
-        
     except json.JSONDecodeError as e:
         print(f"Failed to parse Gemini response as JSON: {e}")
         return None
@@ -150,6 +245,60 @@ Invoice Text:
         return None
 
 
+def extract_with_gemini(pdf_text: str, invoice_type: str = "TAX_INVOICE") -> Optional[InvoiceData]:
+    """
+    Extract invoice data using Gemini API.
+    
+    Args:
+        pdf_text: Raw text extracted from PDF
+        invoice_type: Type of invoice (TAX_INVOICE or DEBIT)
+        
+    Returns:
+        InvoiceData object or None if extraction fails
+    """
+    model = _get_model()
+    if model is None:
+        return None
+    return _extract_with_model(model, pdf_text, invoice_type)
+
+
+def extract_with_gemini_batch(
+    items: List[Tuple[str, str]],
+    max_workers: int = GEMINI_MAX_CONCURRENCY
+) -> List[Optional[InvoiceData]]:
+    """
+    Extract several invoices with concurrent Gemini requests.
+    
+    Args:
+        items: List of (pdf_text, invoice_type) pairs
+        max_workers: Maximum number of requests in flight at once
+        
+    Returns:
+        List of InvoiceData (or None on failure), in the same order as items
+    """
+    if not items:
+        return []
+    
+    model = _get_model()
+    if model is None:
+        return [None] * len(items)
+    
+    # Requests are network-bound, so threads overlap the round-trips
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(lambda item: _extract_with_model(model, *item), items))
+
+
+# parse_invoice errors for files it skips or cannot open; Gemini gets no usable text from these either
+_NO_FALLBACK_ERRORS = ("Credit notes are not supported", "Not a PDF file", "Empty PDF file", "Error reading PDF")
+
+
+def _needs_fallback(invoice: InvoiceData) -> bool:
+    """True when regex extraction came up short on an invoice it actually tried to parse."""
+    if invoice.invoice_number and invoice.total_amount > 0:
+        return False
+    return not any(err.startswith(_NO_FALLBACK_ERRORS) for err in invoice.extraction_errors)
+
+
 def parse_invoice_with_fallback(pdf_path: str) -> InvoiceData:
     """
     Parse invoice using regex first, fall back to Gemini if needed.
@@ -165,8 +314,8 @@ def parse_invoice_with_fallback(pdf_path: str) -> InvoiceData:
     # Try regex first
     invoice = parse_invoice(pdf_path)
     
-    # Check if extraction was successful
-    if invoice.invoice_number and invoice.total_amount > 0:
+    # Check if extraction was successful, or the file was skipped
+    if not _needs_fallback(invoice):
         return invoice
     
     # Fall back to Gemini
@@ -185,6 +334,40 @@ def parse_invoice_with_fallback(pdf_path: str) -> InvoiceData:
     return invoice
 
 
+def parse_invoices_with_fallback(pdf_paths: List[str]) -> List[InvoiceData]:
+    """
+    Parse several invoices with regex, sending all incomplete ones to Gemini in one batch.
+    
+    Args:
+        pdf_paths: Paths to PDF files
+        
+    Returns:
+        List of InvoiceData objects, in the same order as pdf_paths
+    """
+    from invoice_parser import parse_invoices, extract_text_from_pdf, detect_invoice_type
+    
+    # Try regex first
+    invoices = parse_invoices(pdf_paths)
+    pending = [i for i, inv in enumerate(invoices) if _needs_fallback(inv)]
+    if not pending:
+        return invoices
+    
+    # Fall back to Gemini
+    print(f"Regex extraction incomplete for {len(pending)} invoice(s), trying Gemini API...")
+    
+    items = [
+        (extract_text_from_pdf(pdf_paths[i]), detect_invoice_type(os.path.basename(pdf_paths[i])))
+        for i in pending
+    ]
+    for i, gemini_result in zip(pending, extract_with_gemini_batch(items)):
+        if gemini_result and gemini_result.invoice_number:
+            invoices[i] = gemini_result
+        else:
+            invoices[i].extraction_errors.append("Gemini fallback also failed")
+    
+    return invoices
+
+
 if __name__ == "__main__":
     import sys
     
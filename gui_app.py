@@ -6,8 +6,12 @@ Tkinter-based GUI for parsing airline invoices and generating Logisys CSV files.
 import os
 import sys
 import threading
-import queue
+import time
+from collections import deque
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from tkinter import (
     Tk, Frame, Label, Button, Entry, Text, Scrollbar, Canvas,
@@ -25,8 +29,9 @@ except ImportError:
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from invoice_parser import parse_invoice, InvoiceData
-from csv_generator import generate_csv, generate_single_csv, CSV_HEADERS
+# The parser and CSV modules are imported lazily so the window paints immediately;
+# _preload_backend warms them up in the background. pdfplumber is only ever loaded
+# by the parsing worker processes.
 
 # --- Color Palette ---
 BG_COLOR = "#F0F2F5"
@@ -38,9 +43,14 @@ TEXT_PRIMARY = "#212121"
 TEXT_SECONDARY = "#757575"
 BORDER_COLOR = "#E0E0E0"
 SUCCESS_GREEN = "#2E7D32"
+ERROR_RED = "#C62828"
+WARNING_ORANGE = "#E65100"
 LOG_BG = "#FAFBFC"
 LOG_FG = "#333333"
 
+# Log widget keeps at most this many lines; older ones are dropped
+MAX_LOG_LINES = 5000
+
 
 class LogRedirector:
     """Redirect print statements to the GUI log."""
@@ -48,12 +58,56 @@ class LogRedirector:
     def __init__(self, text_widget, queue):
         self.text_widget = text_widget
         self.queue = queue
+        self._buf = []  # Partial line waiting for its newline
     
     def write(self, message):
-        self.queue.put(message)
+        self._buf.append(message)
+        if "\n" not in message:
+            return
+        # Enqueue complete lines only; print() emits several fragments per line
+        *lines, tail = "".join(self._buf).split("\n")
+        self._buf = [tail] if tail else []
+        for line in lines:
+            self.queue.append((line, None))
     
     def flush(self):
-        pass
+        if self._buf:
+            self.queue.append(("".join(self._buf), None))
+            self._buf = []
+
+
+# Last formatted log timestamp, keyed by whole epoch second
+_TS_CACHE = [0, ""]
+
+
+def _log_timestamp() -> str:
+    """HH:MM:SS for the current second; strftime runs at most once per second."""
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[0] = now
+        _TS_CACHE[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _TS_CACHE[1]
+
+
+def _preload_backend():
+    """Import the parsing and CSV modules while the user is still picking files."""
+    import invoice_parser
+    import csv_generator
+
+
+@lru_cache(maxsize=1)
+def _load_logo_photo(path: str, height: int = 40):
+    """Decode and resize the header logo once per process; returns None if unavailable."""
+    if not HAS_PIL or not os.path.isfile(path):
+        return None
+    try:
+        img = Image.open(path)
+        # scale to the given height keeping aspect ratio
+        width = int(img.width * height / img.height)
+        resample = getattr(Image, "Resampling", Image).LANCZOS  # Pillow >= 9.1 moved the enum
+        return ImageTk.PhotoImage(img.resize((width, height), resample))
+    except Exception:
+        return None
 
 
 class InvoiceParserApp:
@@ -71,7 +125,7 @@ class InvoiceParserApp:
         self.output_dir = StringVar(value=os.getcwd())
         self.group_by_gstin = BooleanVar(value=True)
         self.is_processing = False
-        self.log_queue = queue.Queue()
+        self.log_queue = deque()  # (message, tag) pairs; append/popleft are thread-safe
         
         # Configure ttk styles
         self._setup_styles()
@@ -79,10 +133,15 @@ class InvoiceParserApp:
         # Build UI
         self._create_widgets()
         self._start_log_polling()
+        threading.Thread(target=_preload_backend, daemon=True).start()
 
     def _setup_styles(self):
         """Configure modern ttk styles."""
         style = ttk.Style()
+        # Styles live in the Tk interpreter, so a second window on the same
+        # root already has them; re-configuring would re-theme every widget.
+        if style.lookup("Accent.TButton", "background") == ACCENT:
+            return
         try:
             style.theme_use("clam")
         except Exception:
@@ -163,17 +222,7 @@ class InvoiceParserApp:
 
         # Logo
         logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
-        self._logo_image = None
-        if HAS_PIL and os.path.isfile(logo_path):
-            try:
-                img = Image.open(logo_path)
-                # scale to 40px height keeping aspect ratio
-                h = 40
-                w = int(img.width * h / img.height)
-                img = img.resize((w, h), Image.LANCZOS)
-                self._logo_image = ImageTk.PhotoImage(img)
-            except Exception:
-                pass
+        self._logo_image = _load_logo_photo(logo_path)
 
         if self._logo_image:
             logo_label = Label(header_frame, image=self._logo_image, bg=CARD_BG)
@@ -233,7 +282,7 @@ class InvoiceParserApp:
         self.process_btn.pack(side=LEFT, padx=(0, 14))
 
         self.progress = ttk.Progressbar(
-            action_frame, mode="indeterminate", length=260,
+            action_frame, mode="determinate", maximum=100, length=260,
             style="blue.Horizontal.TProgressbar",
         )
         self.progress.pack(side=LEFT, padx=(0, 12))
@@ -290,30 +339,41 @@ class InvoiceParserApp:
         clear_log_btn.pack(side=RIGHT, padx=(0, 10))
     
     def _log(self, message: str, tag: str = None):
-        """Add a message to the log text widget."""
+        """Queue a message for the log widget (Thread-safe)."""
+        self.log_queue.append((message, tag))
+    
+    def _start_log_polling(self):
+        """Poll the log queue and flush all pending messages in a single insert."""
+        timestamp = None
+        chunks = []
+        while self.log_queue:
+            message, tag = self.log_queue.popleft()
+            message = message.strip()
+            if not message:
+                continue
+            if timestamp is None:
+                timestamp = _log_timestamp()
+            chunks.extend((f"[{timestamp}] {message}\n", tag or ()))
+        if chunks:
+            self._write_log(chunks)
+        self.root.after(100, self._start_log_polling)
+    
+    def _write_log(self, chunks: list):
+        """Insert alternating (text, tags) chunks into the log widget (main thread only)."""
+        # Only follow the tail if the user hasn't scrolled up
+        at_bottom = self.log_text.yview()[1] >= 1.0
         self.log_text.configure(state="normal")
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted = f"[{timestamp}] {message}\n"
+        self.log_text.insert(END, *chunks)
         
-        if tag:
-            self.log_text.insert(END, formatted, tag)
-        else:
-            self.log_text.insert(END, formatted)
+        # Keep the widget bounded; drop the oldest lines in one delete
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - MAX_LOG_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         
-        self.log_text.see(END)
+        if at_bottom:
+            self.log_text.see(END)
         self.log_text.configure(state="disabled")
     
-    def _start_log_polling(self):
-        """Poll the log queue and update the text widget."""
-        try:
-            while True:
-                message = self.log_queue.get_nowait()
-                if message.strip():
-                    self._log(message.strip())
-        except queue.Empty:
-            pass
-        self.root.after(100, self._start_log_polling)
-    
     def _select_files(self):
         """Open file dialog to select PDF files."""
         files = filedialog.askopenfilenames(
@@ -346,82 +406,109 @@ class InvoiceParserApp:
     def _start_processing(self):
         """Start processing invoices in a background thread."""
         if not self.selected_files:
-            messagebox.showwarning("No Files", "Please select at least one PDF file.")
+            self._flash_status("Select at least one PDF", ERROR_RED)
             return
         
         if self.is_processing:
             return
         
+        # Ask where to save before starting, so the worker thread never touches Tk
+        output_dir = filedialog.askdirectory(
+            title="Select Output Directory for CSV",
+            initialdir=os.getcwd(),
+        )
+        if not output_dir:
+            self._log("CSV generation cancelled by user.", "warning")
+            self._flash_status("Cancelled", WARNING_ORANGE)
+            return
+        self.output_dir.set(output_dir)
+        
         self.is_processing = True
         self.process_btn.configure(state="disabled")
         self.gen_csv_btn.configure(state="disabled")
-        self.progress.start(10)
+        # Determinate bar: advanced once per parsed file instead of animating every 10 ms
+        self.progress.configure(maximum=len(self.selected_files), value=0)
         self.status_label.configure(text="Processing...", fg=ACCENT)
         
         # Start background thread
-        thread = threading.Thread(target=self._process_invoices, daemon=True)
+        thread = threading.Thread(
+            target=self._process_invoices,
+            args=(output_dir, self.group_by_gstin.get()),
+            daemon=True,
+        )
         thread.start()
     
-    def _process_invoices(self):
+    def _process_invoices(self, output_dir: str, group_by_gstin: bool):
         """Process all selected invoices (runs in background thread)."""
+        from invoice_parser import is_pdf_file, parse_invoice
+        from csv_generator import StreamingCsvWriter
+        
         try:
-            parsed_invoices: List[InvoiceData] = []
             total = len(self.selected_files)
             success_count = 0
             failed_count = 0
             
             self._log(f"Starting to process {total} file(s)...", "info")
             
-            for i, pdf_path in enumerate(self.selected_files, 1):
-                filename = os.path.basename(pdf_path)
-                
-                try:
-                    self._log(f"[{i}/{total}] Parsing: {filename}")
-                    invoice = parse_invoice(pdf_path)
-                    
-                    if invoice.invoice_number:
-                        parsed_invoices.append(invoice)
-                        self._log(f"  ✓ {invoice.airline}: {invoice.invoice_number} | Total: ₹{invoice.total_amount}", "success")
-                        success_count += 1
-                    else:
-                        errors = ", ".join(invoice.extraction_errors) if invoice.extraction_errors else "Unknown error"
-                        self._log(f"  ✗ Failed: {errors}", "error")
-                        failed_count += 1
-                        
-                except Exception as e:
-                    self._log(f"  ✗ Error processing {filename}: {str(e)}", "error")
+            # Reject non-PDFs (possible via the "All files" filter) before starting workers
+            basenames = [os.path.basename(p) for p in self.selected_files]
+            pdf_indices = []
+            for index, pdf_path in enumerate(self.selected_files):
+                if is_pdf_file(pdf_path):
+                    pdf_indices.append(index)
+                else:
+                    self._log(f"  ✗ Not a PDF: {basenames[index]}", "error")
                     failed_count += 1
             
-            # Generate CSV
-            if parsed_invoices:
-                self._log(f"\nGenerating CSV file(s)...", "info")
-
-                # Ask user where to save
-                output_dir = filedialog.askdirectory(
-                    title="Select Output Directory for CSV",
-                    initialdir=os.getcwd(),
-                )
-                if not output_dir:
-                    self._log("CSV generation cancelled by user.", "warning")
-                    return
-
-                self.output_dir.set(output_dir)
-                
-                try:
-                    generated_files = generate_csv(
-                        parsed_invoices,
-                        output_dir,
-                        group_by_gstin=self.group_by_gstin.get()
-                    )
-                    
-                    for f in generated_files:
-                        self._log(f"  ✓ Created: {os.path.basename(f)}", "success")
+            # Parse in worker processes; results are logged as they complete but
+            # written to CSV in selection order, so the same selection gives the same files
+            workers = max(1, min(os.cpu_count() or 1, len(pdf_indices)))
+            csv_writer = StreamingCsvWriter(output_dir, group_by_gstin=group_by_gstin)
+            with csv_writer, ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(parse_invoice, self.selected_files[index]): pos
+                    for pos, index in enumerate(pdf_indices)
+                }
+                ready = {}  # Finished ahead of an earlier file: position -> invoice (None if failed)
+                next_pos = 0
+                # Rejected files count towards progress
+                for i, future in enumerate(as_completed(futures), failed_count + 1):
+                    self.root.after(0, lambda done=i: self.progress.configure(value=done))
+                    pos = futures[future]
+                    filename = basenames[pdf_indices[pos]]
+                    invoice = None
                     
-                    self._log(f"\n✓ Complete! Processed {success_count}/{total} invoices.", "success")
-                    self._log(f"  Output directory: {output_dir}", "info")
+                    try:
+                        invoice = future.result()
+                        self._log(f"[{i}/{total}] Parsed: {filename}")
+                        
+                        if invoice.invoice_number:
+                            self._log(f"  ✓ {invoice.airline}: {invoice.invoice_number} | Total: ₹{invoice.total_amount}", "success")
+                            success_count += 1
+                        else:
+                            errors = ", ".join(invoice.extraction_errors) if invoice.extraction_errors else "Unknown error"
+                            self._log(f"  ✗ Failed: {errors}", "error")
+                            failed_count += 1
+                            invoice = None
+                            
+                    except Exception as e:
+                        self._log(f"  ✗ Error processing {filename}: {str(e)}", "error")
+                        failed_count += 1
                     
-                except Exception as e:
-                    self._log(f"  ✗ CSV generation error: {str(e)}", "error")
+                    ready[pos] = invoice
+                    while next_pos in ready:
+                        invoice = ready.pop(next_pos)
+                        if invoice is not None:
+                            csv_writer.write(invoice)
+                        next_pos += 1
+            
+            generated_files = csv_writer.close()
+            if success_count:
+                for f in generated_files:
+                    self._log(f"  ✓ Created: {os.path.basename(f)}", "success")
+                
+                self._log(f"\n✓ Complete! Processed {success_count}/{total} invoices.", "success")
+                self._log(f"  Output directory: {output_dir}", "info")
             else:
                 self._log("No invoices were successfully parsed.", "warning")
             
@@ -435,17 +522,29 @@ class InvoiceParserApp:
             # Update UI in main thread
             self.root.after(0, self._processing_complete)
     
+    def _flash_status(self, text: str, color: str, duration_ms: int = 3000):
+        """Show a transient status message instead of a blocking dialog."""
+        self.status_label.configure(text=text, fg=color)
+        
+        def _reset():
+            # Don't clobber a status set since (e.g. "Processing...")
+            if self.status_label.cget("text") == text:
+                self.status_label.configure(text="Ready", fg=TEXT_SECONDARY)
+        
+        self.root.after(duration_ms, _reset)
+    
     def _processing_complete(self):
         """Called when processing is complete."""
         self.is_processing = False
         self.process_btn.configure(state="normal")
         self.gen_csv_btn.configure(state="normal")
-        self.progress.stop()
         self.status_label.configure(text="Complete", fg=SUCCESS_GREEN)
 
 
 def main():
     """Main entry point."""
+    # Needed for the parser worker processes in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     root = Tk()
     app = InvoiceParserApp(root)
     root.mainloop()
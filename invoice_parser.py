@@ -3,15 +3,22 @@ Invoice Parser Module for Airline PDF Invoices
 Extracts data from Air India, Air India Express, IndiGo, Akasa Air, and Gulf Air invoices.
 """
 
+import hashlib
+import io
+import json
+import os
 import re
+import sys
+import tempfile
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-import pdfplumber
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Pattern, Union, BinaryIO
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceData:
     """Structured invoice data extracted from PDF."""
     airline: str = ""
@@ -86,6 +93,105 @@ GSTIN_STATE_MAP = {
 }
 
 
+# Precompiled patterns, compiled once at import instead of per extract() call
+_AMOUNT_STRIP_RE = re.compile(r'[₹$,\s]')
+
+# Shared across airlines
+_GSTIN = r'\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2}'  # 15-character GSTIN
+_GSTIN_RE = re.compile(rf'GSTIN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_GSTIN_OF_CUSTOMER_RE = re.compile(rf'GSTIN\s*of\s*Customer\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_GSTIN_CUSTOMER_NAME_RE = re.compile(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', re.IGNORECASE)
+_INVOICE_OR_DEBIT_NUMBER_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', re.IGNORECASE)
+_PNR_RE = re.compile(r'PNR\s*[:\s]*([A-Z0-9]{6})', re.IGNORECASE)
+_FLIGHT_FROM_RE = re.compile(r'Flight\s*From\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_GRAND_TOTAL_LINE_RE = re.compile(r'Grand\s*Total.*', re.IGNORECASE)
+_AMOUNT_2DP_RE = re.compile(r'(\d[\d,]*\.\d{2})')
+_SAC_TAXABLE_RE = re.compile(r'996425\s+(\d[\d,]*\.\d{2})')
+_AIRPORT_CHARGES_RE = re.compile(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', re.IGNORECASE)
+
+# Air India
+_AI_DATE_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', re.IGNORECASE)
+_AI_CUSTOMER_GSTIN_RE = re.compile(rf'Customer\s*GSTIN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AI_CUSTOMER_NAME_RE = re.compile(r'Customer\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)')
+_AI_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:MR|MS|MRS)?)', re.IGNORECASE)
+_AI_ROUTING_RE = re.compile(r'Routing\s*[:\s]*([A-Z]{6,})', re.IGNORECASE)
+_AI_TOTAL_RE = re.compile(r'(?:^|\n)Total\s+(\d[\d,]*\.?\d*)\s*$', re.MULTILINE)
+_AI_NON_TAXABLE_FARE_RE = re.compile(r'Non-taxable\s*fare\s*details\s*:\s*(.+)', re.IGNORECASE)
+
+# Air India Express
+_AIX_INVOICE_RE = re.compile(r'Invoice\s*Number\s*[:\s]*([A-Z0-9]+)', re.IGNORECASE)
+_AIX_VENDOR_GSTIN_RE = re.compile(rf'GSTN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AIX_DATE_RE = re.compile(r'Invoice\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', re.IGNORECASE)
+_AIX_PNR_RE = re.compile(r'PNR\s*(?:No)?\s*[:\s]*([A-Z0-9]{6})', re.IGNORECASE)
+_AIX_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+)', re.IGNORECASE)
+_AIX_FLIGHT_TO_RE = re.compile(r'Flight\s*To\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_AIX_IGST_RE = re.compile(r'996425[^\n]*?(\d+)\s*%\s+(\d[\d,]*\.\d{2})')
+_AIX_AIRPORT_TAXES_RE = re.compile(r'Airport\s*Taxes[^\n]*?\s(\d[\d,]*\.\d{2})\s+(\d[\d,]*\.\d{2})', re.IGNORECASE)
+_AIX_NON_TAXABLE_RE = re.compile(r'Non\s*Taxable[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+
+# IndiGo
+_INDIGO_INVOICE_RE = re.compile(r'Number\s*[:\s]*([A-Z]{2}\d+[A-Z]{2}\d+)')
+_INDIGO_DATE_RE = re.compile(r'Date\s*[:\s]*(\d{1,2}[^\w\d]+[A-Za-z]{3}[^\w\d]+\d{4})', re.IGNORECASE)
+_INDIGO_DATE_SEP_RE = re.compile(r'[^\w\d]+')
+_INDIGO_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*\n?([A-Za-z][A-Za-z\s]+)', re.IGNORECASE)
+_INDIGO_FROM_RE = re.compile(r'From\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_INDIGO_TO_RE = re.compile(r'(?<!From\s)To\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_INDIGO_SAC_LINE_RE = re.compile(r'996425\s+.*')
+
+# Numeric cells of a table row: amounts, plain integers and "N %" rates
+_NUM_TOKEN_RE = re.compile(r'\d[\d,]*(?:\.\d+)?(?:\s*%)?')
+
+# Akasa Air
+_AKASA_DATE_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}-[A-Za-z]{3}-\d{4})', re.IGNORECASE)
+_AKASA_CUSTOMER_GSTIN_RE = re.compile(rf'GSTIN[/\s]*Unique\s*ID\s*of\s*Customer\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AKASA_CUSTOMER_NAME_RE = re.compile(r'Name\s*of\s*Customer\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', re.IGNORECASE)
+_AKASA_AMOUNT_RE = re.compile(r'(\d[\d,]*\.\d+)')
+_AKASA_IGST_RE = re.compile(r'5%\s+(\d[\d,]*\.\d{2})')
+_AKASA_CGST_SGST_RE = re.compile(r'2\.5%\s+(\d[\d,]*\.\d{2})\s+2\.5%\s+(\d[\d,]*\.\d{2})')
+
+# Gulf Air
+_GULF_INVOICE_RE = re.compile(r'Invoice\s*No\s*[:\s]*([A-Z0-9/]+)', re.IGNORECASE)
+_GULF_DATE_RE = re.compile(r'Invoice\s*Date\s*[:\s]*(\d{1,2}-\d{1,2}-\d{4})', re.IGNORECASE)
+_GULF_CUSTOMER_NAME_RE = re.compile(r'Customer\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', re.IGNORECASE)
+_GULF_TICKET_RE = re.compile(r'Ticket\s*/\s*Document\s*No\s*[:\s]*(\d+)', re.IGNORECASE)
+_GULF_TAXABLE_RE = re.compile(r'Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_NON_TAXABLE_RE = re.compile(r'Non-Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_TOTAL_RE = re.compile(r'Total\s*\(including\s*taxes\)[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_IGST_RE = re.compile(r'Integrated\s*Tax\s*\(IGST\)\s*(\d+)%\s*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+
+# PDF text clean-up: numbers split across lines
+_SPLIT_NUMBER_RE = re.compile(r'(?<=\d\.)(\d?)\n(?=\d)')
+
+
+# Accepted invoice date formats, in priority order
+_DATE_FORMATS = (
+    "%d/%m/%Y",      # 15/05/2025
+    "%d-%m-%Y",      # 15-05-2025
+    "%d-%b-%Y",      # 15-May-2025
+    "%d-%B-%Y",      # 15-May-2025
+    "%Y-%m-%d",      # 2025-05-15
+    "%d %b %Y",      # 15 May 2025
+    "%d %B %Y",      # 15 May 2025
+)
+
+
+def _date_format_candidates(date_str: str) -> tuple:
+    """The one format this date's shape implies, followed by the rest as a fallback."""
+    if "/" in date_str:
+        likely = "%d/%m/%Y"
+    elif "-" in date_str:
+        parts = date_str.split("-")
+        if len(parts) == 3 and parts[1].isalpha():
+            likely = "%d-%b-%Y" if len(parts[1]) == 3 else "%d-%B-%Y"
+        else:
+            likely = "%Y-%m-%d" if len(parts[0]) == 4 else "%d-%m-%Y"
+    else:
+        parts = date_str.split()
+        likely = "%d %b %Y" if len(parts) == 3 and len(parts[1]) == 3 else "%d %B %Y"
+    return (likely,) + tuple(fmt for fmt in _DATE_FORMATS if fmt != likely)
+
+
+@lru_cache(maxsize=4096)  # Invoices in a batch share a handful of dates
 def parse_date_to_standard(date_str: str) -> str:
     """Convert various date formats to DD-MMM-YYYY format."""
     if not date_str:
@@ -93,18 +199,8 @@ def parse_date_to_standard(date_str: str) -> str:
     
     date_str = date_str.strip()
     
-    # Try different date formats
-    formats = [
-        "%d/%m/%Y",      # 15/05/2025
-        "%d-%m-%Y",      # 15-05-2025
-        "%d-%b-%Y",      # 15-May-2025
-        "%d-%B-%Y",      # 15-May-2025
-        "%Y-%m-%d",      # 2025-05-15
-        "%d %b %Y",      # 15 May 2025
-        "%d %B %Y",      # 15 May 2025
-    ]
-    
-    for fmt in formats:
+    # The shape picks the right format up front, so strptime rarely has to fail first
+    for fmt in _date_format_candidates(date_str):
         try:
             dt = datetime.strptime(date_str, fmt)
             return dt.strftime("%d-%b-%Y") # Title Case: 14-May-2025
@@ -119,8 +215,15 @@ def parse_amount(amount_str: str) -> float:
     if not amount_str:
         return 0.0
     
-    # Remove currency symbols, commas, and whitespace
-    cleaned = re.sub(r'[₹$,\s]', '', str(amount_str))
+    # Fast path: most amounts only carry thousands separators
+    cleaned = str(amount_str).replace(',', '')
+    try:
+        return float(cleaned)
+    except ValueError:
+        pass
+    
+    # Remove currency symbols, and whitespace
+    cleaned = _AMOUNT_STRIP_RE.sub('', cleaned)
     
     try:
         return float(cleaned)
@@ -128,24 +231,45 @@ def parse_amount(amount_str: str) -> float:
         return 0.0
 
 
+
+def _line_at(text: str, pos: int) -> str:
+    """Return text from pos to the end of its line."""
+    end = text.find('\n', pos)
+    return text[pos:] if end < 0 else text[pos:end]
+
+
+def _row_tokens(line: str) -> List[str]:
+    """Split a table row into its numeric cells, normalising rates to e.g. '5%'."""
+    return [tok.replace(' ', '') for tok in _NUM_TOKEN_RE.findall(line)]
+
+
+def _is_amount(token: str) -> bool:
+    """True for decimal amount cells such as '3,962.00'."""
+    return '.' in token and not token.endswith('%')
+
+
 class BaseParser(ABC):
     """Abstract base class for airline invoice parsers."""
     
     airline_name: str = ""
+    # Upper-case text markers that identify this airline's invoices
+    markers: tuple = ()
+    # Upper-case markers of another airline that rule this one out
+    excludes: tuple = ()
     
-    @abstractmethod
     def can_parse(self, text: str) -> bool:
-        """Check if this parser can handle the given text."""
-        pass
+        """Check if this parser can handle the given text, on its own rather than by PARSERS priority."""
+        upper = text.upper()
+        return any(m in upper for m in self.markers) and not any(m in upper for m in self.excludes)
     
     @abstractmethod
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        """Extract invoice data from text."""
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        """Extract invoice data from text; keep the full text in raw_text only if include_raw."""
         pass
     
-    def _safe_search(self, pattern: str, text: str, group: int = 1, default: str = "") -> str:
-        """Safely search for a pattern and return the match or default."""
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+    def _safe_search(self, pattern: Pattern, text: str, group: int = 1, default: str = "") -> str:
+        """Safely search for a precompiled pattern and return the match or default."""
+        match = pattern.search(text)
         if match:
             try:
                 return match.group(group).strip()
@@ -153,7 +277,15 @@ class BaseParser(ABC):
                 return default
         return default
     
-    def _extract_gstin_state(self, gstin: str) -> tuple:
+    def _extract_customer_gstin(self, data: InvoiceData, pattern: Pattern, text: str) -> None:
+        """Fill customer GSTIN and the state derived from it, if the pattern matches."""
+        gstin_match = pattern.search(text)
+        if gstin_match:
+            data.customer_gstin = gstin_match.group(1)
+            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+    
+    @staticmethod
+    def _extract_gstin_state(gstin: str) -> tuple:
         """Extract state code and name from GSTIN."""
         if len(gstin) >= 2:
             state_code = gstin[:2]
@@ -166,52 +298,49 @@ class AirIndiaParser(BaseParser):
     """Parser for Air India and Air India LTD invoices."""
     
     airline_name = "AIR INDIA"
+    markers = ("AIR INDIA LTD",)
+    excludes = ("AIR INDIA EXPRESS",)
     
-    def can_parse(self, text: str) -> bool:
-        return "AIR INDIA LTD" in text.upper() and "AIR INDIA EXPRESS" not in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice/Debit Note Number - handle both formats
-        inv_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _INVOICE_OR_DEBIT_NUMBER_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Vendor GSTIN (Supplier) - usually first GSTIN occurrence
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         if vendor_match:
             data.vendor_gstin = vendor_match.group(1)
         
         # Invoice/Debit Note Date
-        date_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', text, re.IGNORECASE)
+        date_match = _AI_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'Customer\s*GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _AI_CUSTOMER_GSTIN_RE, text)
         
         # Customer Name - stop at newline or Reference
-        cust_match = re.search(r'Customer\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', text)
+        cust_match = _AI_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()  # Take only first line
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:MR|MS|MRS)?)', text, re.IGNORECASE)
+        pass_match = _AI_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # Routing
-        routing_match = re.search(r'Routing\s*[:\s]*([A-Z]{6,})', text, re.IGNORECASE)
+        routing_match = _AI_ROUTING_RE.search(text)
         if routing_match:
             routing = routing_match.group(1)
             if len(routing) >= 6:
@@ -220,43 +349,51 @@ class AirIndiaParser(BaseParser):
                 data.routing = f"{data.flight_from} TO {data.flight_to}"
         
         # Total Amount - look for the final "Total" line with amount at end
-        total_match = re.search(r'(?:^|\n)Total\s+(\d[\d,]*\.?\d*)\s*$', text, re.MULTILINE)
+        total_match = _AI_TOTAL_RE.search(text)
         if total_match:
             data.total_amount = parse_amount(total_match.group(1))
         
-        # Air India: 996425 row
+        # Air India: 996425 row, when the amounts share the SAC line
         # Pattern: 996425-...service 3,792.00 170.00 236.00 0.00 3,962.00 5 % 99.50 99.50 0.00 4,397.00
-        sac_line = re.search(r'996425[^\n]*?(\d[\d,]*\.\d+)\s+[\d,\.]+\s+[\d,\.]+\s+[\d,\.]+\s+(\d[\d,]*\.\d+)\s+\d+\s*%', text)
-        if sac_line:
-            data.taxable_value = parse_amount(sac_line.group(1))  # First amount after SAC
+        # Cells before the rate: taxable, other taxable, non-taxable, discount, net taxable
+        sac_pos = text.find('996425')
+        if sac_pos >= 0:
+            cells = _row_tokens(_line_at(text, sac_pos))[1:]
+            rate_idx = next((i for i, cell in enumerate(cells) if cell.endswith('%')), -1)
+            if rate_idx >= 5 and _is_amount(cells[rate_idx - 5]) and _is_amount(cells[rate_idx - 1]):
+                data.taxable_value = parse_amount(cells[rate_idx - 5])  # First amount after SAC
+                non_tax = parse_amount(cells[rate_idx - 3])
+                if non_tax > 0:
+                    data.non_taxable_value = non_tax
         
         # For Air India, parse tax from the table row ending with tax amounts
         # The 996425 row ends with: taxable 5% CGST SGST IGST Total
         # e.g., 3,962.00 5 % 99.50 99.50 0.00 4,397.00
-        tax_row = re.search(r'(\d[\d,]*\.\d+)\s+5\s*%\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)', text)
-        if tax_row:
-            data.taxable_value = parse_amount(tax_row.group(1))
-            data.cgst_amount = parse_amount(tax_row.group(2))
-            data.sgst_amount = parse_amount(tax_row.group(3))
-            data.igst_amount = parse_amount(tax_row.group(4))
-            data.total_amount = parse_amount(tax_row.group(5))
-            data.cgst_rate = 2.5 if data.cgst_amount > 0 else 0
-            data.sgst_rate = 2.5 if data.sgst_amount > 0 else 0
-            data.igst_rate = 5.0 if data.igst_amount > 0 else 0
-        
-        # Non-taxable value from SAC row (3rd amount column = non-taxable)
-        # Pattern: 996425-... 4,593.00 170.00 443.00 0.00 4,763.00 ...
-        non_tax_match = re.search(r'996425[^\n]*?\d[\d,]*\.\d{2}\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})\s+[\d,\.]+\s+\d[\d,]*\.\d{2}\s+\d+\s*%', text)
-        if non_tax_match:
-            non_tax = parse_amount(non_tax_match.group(1))
-            if non_tax > 0:
-                data.non_taxable_value = non_tax
+        for line in text.split('\n'):
+            if '%' not in line:
+                continue
+            cells = _row_tokens(line)
+            rate_idx = next(
+                (i for i in range(1, len(cells) - 4)
+                 if cells[i] == '5%' and all(_is_amount(c) for c in cells[i - 1:i] + cells[i + 1:i + 5])),
+                -1,
+            )
+            if rate_idx > 0:
+                data.taxable_value = parse_amount(cells[rate_idx - 1])
+                data.cgst_amount = parse_amount(cells[rate_idx + 1])
+                data.sgst_amount = parse_amount(cells[rate_idx + 2])
+                data.igst_amount = parse_amount(cells[rate_idx + 3])
+                data.total_amount = parse_amount(cells[rate_idx + 4])
+                data.cgst_rate = 2.5 if data.cgst_amount > 0 else 0
+                data.sgst_rate = 2.5 if data.sgst_amount > 0 else 0
+                data.igst_rate = 5.0 if data.igst_amount > 0 else 0
+                break
         
         # Fallback: "Non-taxable fare details: P2 = 236.00; IN = 207.00"
         if data.non_taxable_value == 0:
-            non_tax_line = re.search(r'Non-taxable\s*fare\s*details\s*:\s*(.+)', text, re.IGNORECASE)
+            non_tax_line = _AI_NON_TAXABLE_FARE_RE.search(text)
             if non_tax_line:
-                amounts = re.findall(r'(\d[\d,]*\.\d{2})', non_tax_line.group(1))
+                amounts = _AMOUNT_2DP_RE.findall(non_tax_line.group(1))
                 if amounts:
                     data.non_taxable_value = sum(parse_amount(a) for a in amounts)
         
@@ -267,52 +404,48 @@ class AirIndiaExpressParser(BaseParser):
     """Parser for Air India Express invoices."""
     
     airline_name = "AIR INDIA EXPRESS"
+    markers = ("AIR INDIA EXPRESS",)
     
-    def can_parse(self, text: str) -> bool:
-        return "AIR INDIA EXPRESS" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number
-        inv_match = re.search(r'Invoice\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _AIX_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
             
         # Vendor GSTIN (Supplier) - AI Express uses "GSTN"
-        vendor_match = re.search(r'GSTN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _AIX_VENDOR_GSTIN_RE.search(text)
         if vendor_match:
             data.vendor_gstin = vendor_match.group(1)
         
         # Invoice Date
-        date_match = re.search(r'Invoice\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', text, re.IGNORECASE)
+        date_match = _AIX_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _GSTIN_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             data.customer_name = cust_match.group(1).strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*(?:No)?\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _AIX_PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+)', text, re.IGNORECASE)
+        pass_match = _AIX_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # Flight From/To
-        from_match = re.search(r'Flight\s*From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
-        to_match = re.search(r'Flight\s*To\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _FLIGHT_FROM_RE.search(text)
+        to_match = _AIX_FLIGHT_TO_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
         if to_match:
@@ -322,33 +455,33 @@ class AirIndiaExpressParser(BaseParser):
         
         # Total from Grand Total line (last amount)
         # Grand Total 31,451.42 1,772.00 33,223.42 1,572.58 34,796.00
-        grand_total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        grand_total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if grand_total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d{2})', grand_total_line.group(0))
+            amounts = _AMOUNT_2DP_RE.findall(grand_total_line.group(0))
             if amounts:
                 data.total_amount = parse_amount(amounts[-1])  # Last amount = grand total
         
         # Extract from SAC 996425 row:
         # Air Ticket charges 996425 31,451.42 - 31,451.42 5 % 1,572.58 33,024.00
-        sac_row = re.search(r'996425\s+(\d[\d,]*\.\d{2})', text)
+        sac_row = _SAC_TAXABLE_RE.search(text)
         if sac_row:
             data.taxable_value = parse_amount(sac_row.group(1))
         
         # IGST from SAC row: "5 % 1,572.58"
-        igst_match = re.search(r'996425[^\n]*?(\d+)\s*%\s+(\d[\d,]*\.\d{2})', text)
+        igst_match = _AIX_IGST_RE.search(text)
         if igst_match:
             data.igst_rate = parse_amount(igst_match.group(1))
             data.igst_amount = parse_amount(igst_match.group(2))
         
         # Non-taxable: Airport Taxes-Pass Through
         # Pattern: "Airport Taxes-Pass Through - - 1,772.00 1,772.00 ..."
-        airport_match = re.search(r'Airport\s*Taxes[^\n]*?\s(\d[\d,]*\.\d{2})\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIX_AIRPORT_TAXES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
         # Fallback: look for "Non Taxable" or "Exempt" value in the table
         if data.non_taxable_value == 0:
-            non_tax_match = re.search(r'Non\s*Taxable[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+            non_tax_match = _AIX_NON_TAXABLE_RE.search(text)
             if non_tax_match:
                 val = parse_amount(non_tax_match.group(1))
                 if val > 0:
@@ -361,15 +494,14 @@ class IndiGoParser(BaseParser):
     """Parser for IndiGo (InterGlobe Aviation) invoices."""
     
     airline_name = "INDIGO"
+    markers = ("INDIGO", "INTERGLOBE AVIATION")
     
-    def can_parse(self, text: str) -> bool:
-        return "INDIGO" in text.upper() or "INTERGLOBE AVIATION" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number (format: KA1252612CR78975)
-        inv_match = re.search(r'Number\s*[:\s]*([A-Z]{2}\d+[A-Z]{2}\d+)', text)
+        inv_match = _INDIGO_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
@@ -379,22 +511,22 @@ class IndiGoParser(BaseParser):
         # [^\w\d]+ : One or more non-alphanumeric chars as separator
         # [A-Za-z]{3} : 3-letter month
         # \d{4} : 4-digit year
-        date_match = re.search(r'Date\s*[:\s]*(\d{1,2}[^\w\d]+[A-Za-z]{3}[^\w\d]+\d{4})', text, re.IGNORECASE)
+        date_match = _INDIGO_DATE_RE.search(text)
         if date_match:
             # Normalize to standard format: replace spaces/separators with single dash
-            raw_date = re.sub(r'[^\w\d]+', '-', date_match.group(1))
+            raw_date = _INDIGO_DATE_SEP_RE.sub('-', date_match.group(1))
             data.invoice_date = parse_date_to_standard(raw_date)
         
             data.invoice_date = parse_date_to_standard(raw_date)
         
         # Vendor GSTIN (Supplier) - appears before Customer GSTIN
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         # Ensure it's not the customer one if they appear close
         if vendor_match and "Customer" not in text[vendor_match.start()-20:vendor_match.start()]: 
              data.vendor_gstin = vendor_match.group(1)
         elif vendor_match:
              # Fallback: Find first GSTIN that is NOT followed by "of Customer" or preceded by "Customer"
-             all_matches = re.finditer(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+             all_matches = _GSTIN_RE.finditer(text)
              for m in all_matches:
                  start, end = m.span()
                  context = text[max(0, start-30):end+30]
@@ -403,30 +535,27 @@ class IndiGoParser(BaseParser):
                      break
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _GSTIN_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name - specific to IndiGo format
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*\n?([A-Za-z][A-Za-z\s]+)', text, re.IGNORECASE)
+        pass_match = _INDIGO_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # From/To
-        from_match = re.search(r'From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
-        to_match = re.search(r'(?<!From\s)To\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _INDIGO_FROM_RE.search(text)
+        to_match = _INDIGO_TO_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
         if to_match:
@@ -436,15 +565,15 @@ class IndiGoParser(BaseParser):
         
         # Grand Total - IndiGo format: Grand Total 0 974.00 0 304.00 0.00 0.00 0.00 7,367.00
         # Need to capture the last number on the line
-        total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d{2})', total_line.group(0))
+            amounts = _AMOUNT_2DP_RE.findall(total_line.group(0))
             if amounts:
                 data.total_amount = parse_amount(amounts[-1])  # Take last amount
         
         # IndiGo table parsing using line tokens (more robust)
         # Find line starting with 996425
-        table_line_match = re.search(r'996425\s+.*', text)
+        table_line_match = _INDIGO_SAC_LINE_RE.search(text)
         if table_line_match:
             parts = table_line_match.group(0).split()
             # Basic structure: 0:SAC, 1:Taxable ...
@@ -478,7 +607,7 @@ class IndiGoParser(BaseParser):
         
         # Airport Charges (Non-taxable / Exempted)
         # Pattern: "Airport Charges   0.00   974.00   974.00 ..."
-        airport_match = re.search(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIRPORT_CHARGES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
@@ -489,25 +618,24 @@ class AkasaAirParser(BaseParser):
     """Parser for Akasa Air (SNV Aviation) invoices."""
     
     airline_name = "AKASA AIR"
+    markers = ("AKASA", "SNV AVIATION")
     
-    def can_parse(self, text: str) -> bool:
-        return "AKASA" in text.upper() or "SNV AVIATION" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice/Debit Note Number
-        inv_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _INVOICE_OR_DEBIT_NUMBER_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Invoice/Debit Note Date (format: 22-Oct-2025)
-        date_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}-[A-Za-z]{3}-\d{4})', text, re.IGNORECASE)
+        date_match = _AKASA_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Vendor GSTIN (Supplier)
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         # Ensure it's not the customer one (Customer one is usually "GSTIN/Unique ID of Customer")
         if vendor_match and "Customer" not in text[vendor_match.start():vendor_match.end()+20]:
              data.vendor_gstin = vendor_match.group(1)
@@ -517,24 +645,21 @@ class AkasaAirParser(BaseParser):
                  data.vendor_gstin = vendor_match.group(1)
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN[/\s]*Unique\s*ID\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _AKASA_CUSTOMER_GSTIN_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'Name\s*of\s*Customer\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _AKASA_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Flight From
-        from_match = re.search(r'Flight\s*From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _FLIGHT_FROM_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
             data.routing = f"{data.flight_from}"
@@ -542,9 +667,9 @@ class AkasaAirParser(BaseParser):
         # Grand Total - Akasa format: last amount on the line is the grand total
         # Grand Total 10518.00 1018.00 398.00 11138.00 0.00 0.00 506.00 11644.00
         # Columns: [0]Taxable [1]NonTax [2]Discount [3]TaxableTotal [4]CGST [5]SGST [6]IGST [7]GrandTotal
-        grand_total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        grand_total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if grand_total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d+)', grand_total_line.group(0))
+            amounts = _AKASA_AMOUNT_RE.findall(grand_total_line.group(0))
             if len(amounts) >= 8:
                 data.taxable_value = parse_amount(amounts[0])
                 data.non_taxable_value = parse_amount(amounts[1])
@@ -569,31 +694,34 @@ class AkasaAirParser(BaseParser):
         # Akasa table: SAC Taxable NonTax Discount Total Rate Amount...
         # Only parse if we didn't get data from Grand Total line
         if data.total_amount == 0:
-            akasa_row = re.search(r'996425\s+(\d[\d,]*\.\d+)\s+[\d,\.]+\s+[\d,\.]+\s+(\d[\d,]*\.\d+)[^\d]+\d+%[^\d]+[\d,\.]+[^\d]+\d+%[^\d]+[\d,\.]+[^\d]+5%\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)', text)
-            if akasa_row:
-                data.taxable_value = parse_amount(akasa_row.group(1))
-                # taxable after discount in group 2
-                data.igst_amount = parse_amount(akasa_row.group(3))
+            # Cells: Taxable NonTax Discount Total CGST% CGST SGST% SGST IGST% IGST Total
+            sac_pos = text.find('996425')
+            cells = _row_tokens(_line_at(text, sac_pos))[1:] if sac_pos >= 0 else []
+            if (len(cells) >= 11 and cells[4].endswith('%') and cells[6].endswith('%')
+                    and cells[8] == '5%' and _is_amount(cells[0]) and _is_amount(cells[9])):
+                data.taxable_value = parse_amount(cells[0])
+                # taxable after discount in cells[3]
+                data.igst_amount = parse_amount(cells[9])
                 # Don't overwrite total_amount here - Grand Total (line 472) has the correct full total
                 data.igst_rate = 5.0
             else:
                 # Fallback: simpler pattern
-                taxable_match = re.search(r'996425\s+(\d[\d,]*\.\d{2})', text)
+                taxable_match = _SAC_TAXABLE_RE.search(text)
                 if taxable_match:
                     data.taxable_value = parse_amount(taxable_match.group(1))
-                igst_match = re.search(r'5%\s+(\d[\d,]*\.\d{2})', text)
+                igst_match = _AKASA_IGST_RE.search(text)
                 if igst_match:
                     data.igst_amount = parse_amount(igst_match.group(1))
                     data.igst_rate = 5.0
         
         # Airport Charges (Non-taxable)
         # Pattern: "Airport Charges   0.00   443.00   0.00   443.00 ..."
-        airport_match = re.search(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIRPORT_CHARGES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
         # CGST/SGST for intra-state (e.g., Maharashtra)
-        cgst_match = re.search(r'2\.5%\s+(\d[\d,]*\.\d{2})\s+2\.5%\s+(\d[\d,]*\.\d{2})', text)
+        cgst_match = _AKASA_CGST_SGST_RE.search(text)
         if cgst_match:
             data.cgst_amount = parse_amount(cgst_match.group(1))
             data.sgst_amount = parse_amount(cgst_match.group(2))
@@ -609,57 +737,53 @@ class GulfAirParser(BaseParser):
     """Parser for Gulf Air invoices."""
     
     airline_name = "GULF AIR"
+    markers = ("GULF AIR",)
     
-    def can_parse(self, text: str) -> bool:
-        return "GULF AIR" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number (format: TKMHP/2510/04496)
-        inv_match = re.search(r'Invoice\s*No\s*[:\s]*([A-Z0-9/]+)', text, re.IGNORECASE)
+        inv_match = _GULF_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Invoice Date (format: 21-10-2025)
-        date_match = re.search(r'Invoice\s*Date\s*[:\s]*(\d{1,2}-\d{1,2}-\d{4})', text, re.IGNORECASE)
+        date_match = _GULF_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'Customer\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', text, re.IGNORECASE)
+        cust_match = _GULF_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # Ticket Number as PNR alternative
-        ticket_match = re.search(r'Ticket\s*/\s*Document\s*No\s*[:\s]*(\d+)', text, re.IGNORECASE)
+        ticket_match = _GULF_TICKET_RE.search(text)
         if ticket_match:
             data.pnr = ticket_match.group(1)
         
         # Taxable Value
-        taxable_match = re.search(r'Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        taxable_match = _GULF_TAXABLE_RE.search(text)
         if taxable_match:
             data.taxable_value = parse_amount(taxable_match.group(1))
         
         # Non-Taxable Value
-        non_taxable_match = re.search(r'Non-Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        non_taxable_match = _GULF_NON_TAXABLE_RE.search(text)
         if non_taxable_match:
             data.non_taxable_value = parse_amount(non_taxable_match.group(1))
         
         # Total Value
-        total_match = re.search(r'Total\s*\(including\s*taxes\)[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        total_match = _GULF_TOTAL_RE.search(text)
         if total_match:
             data.total_amount = parse_amount(total_match.group(1))
         
         # IGST (Gulf Air typically uses 18% for international)
-        igst_match = re.search(r'Integrated\s*Tax\s*\(IGST\)\s*(\d+)%\s*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        igst_match = _GULF_IGST_RE.search(text)
         if igst_match:
             data.igst_rate = parse_amount(igst_match.group(1))
             data.igst_amount = parse_amount(igst_match.group(2))
@@ -676,32 +800,186 @@ PARSERS = [
     GulfAirParser(),
 ]
 
+# One case-insensitive pass finds every airline marker without an upper-cased copy of the text
+_AIRLINE_DISPATCH_RE = re.compile(
+    "|".join(re.escape(marker) for parser in PARSERS for marker in parser.markers),
+    re.IGNORECASE,
+)
+_PARSER_BY_MARKER = {marker: parser for parser in PARSERS for marker in parser.markers}
+
+
+def select_parser(text: str) -> Optional[BaseParser]:
+    """Return the highest-priority parser whose marker appears in the text, if any."""
+    found = {_PARSER_BY_MARKER.get(m.upper()) for m in _AIRLINE_DISPATCH_RE.findall(text)}
+    for parser in PARSERS:
+        if parser in found:
+            return parser
+    return None
+
+
+def _read_pdf_header(path: str) -> Optional[bytes]:
+    """First KiB of a file, where the spec allows the %PDF- header to sit; None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(1024)
+    except OSError:
+        return None
+
+
+def is_pdf_file(path: str) -> bool:
+    """Cheap magic-byte check, shared by the GUI and parse_invoice."""
+    header = _read_pdf_header(path)
+    return header is not None and b"%PDF-" in header
+
 
 def detect_invoice_type(filename: str) -> str:
     """Detect invoice type from filename."""
     filename_upper = filename.upper()
     if "DEBIT" in filename_upper:
         return "DEBIT"
-    elif "TAX_INVOICE" in filename_upper or "INVOICE" in filename_upper:
+    elif "INVOICE" in filename_upper:  # Also covers "TAX_INVOICE"
         return "TAX_INVOICE"
     return "UNKNOWN"
 
 
-def extract_text_from_pdf(pdf_path: str, page_num: int = 0) -> str:
-    """Extract text from a specific page of a PDF file."""
-    with pdfplumber.open(pdf_path) as pdf:
-        if page_num < len(pdf.pages):
-            page = pdf.pages[page_num]
+def extract_text_from_pdf(pdf_path: Union[str, BinaryIO], page_num: int = 0) -> str:
+    """Extract text from a specific page of a PDF file, given as a path or a binary stream."""
+    import pdfplumber  # Deferred: pulls in pdfminer, PIL and crypto, which text-only callers never need
+    
+    # Only build the requested page; later pages of multi-page notes are never parsed
+    with pdfplumber.open(pdf_path, pages=[page_num + 1]) as pdf:
+        if pdf.pages:
+            page = pdf.pages[0]
+            # Scanned/image-only pages have no text layer; skip the layout pass
+            if not page.chars:
+                return ""
             text = page.extract_text()
             if text:
                 # Fix numbers split across lines by PDF extraction
                 # e.g., "10,864.0\n0" -> "10,864.00" or "11,838.\n00" -> "11,838.00"
-                text = re.sub(r'(\d\.\d)\n(\d)', r'\1\2', text)
-                text = re.sub(r'(\d\.)\n(\d)', r'\1\2', text)
+                text = _SPLIT_NUMBER_RE.sub(r'\1', text)
                 return text
     return ""
 
 
+# Parsed results are cached on disk by PDF content, so re-running a batch skips
+# PDF decoding and regex work. Entries hold invoice details (customer names, GSTINs,
+# passengers): the MMT_PARSE_CACHE_DIR environment variable moves the cache, or
+# disables it when set to an empty value. Set PARSE_CACHE_DIR to None to disable.
+PARSE_CACHE_DIR = os.environ.get(
+    "MMT_PARSE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mmt_parse")
+) or None
+
+# Least recently used entries beyond this are removed, so the cache stays bounded
+PARSE_CACHE_MAX_ENTRIES = 2000
+
+# Bump when parsing changes in a way the build fingerprint cannot see
+PARSE_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=1)
+def _parser_fingerprint() -> Optional[bytes]:
+    """Identify this parser build, so cached results expire on upgrade; None if unknown."""
+    if getattr(sys, "frozen", False):
+        # Bundled exe: the module source is not on disk, so key on the executable itself
+        try:
+            st = os.stat(sys.executable)
+        except OSError:
+            return None
+        return f"{sys.executable}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8")
+    try:
+        with open(__file__, "rb") as f:
+            h = hashlib.blake2b(f.read(), digest_size=16)
+    except OSError:
+        return None
+    # The text extractor's version matters too: an upgrade can change the text the parsers see.
+    # Read from package metadata so a cache hit never has to import pdfplumber.
+    from importlib import metadata
+    for dist in ("pdfplumber", "pdfminer.six"):
+        try:
+            h.update(f"{dist}={metadata.version(dist)};".encode("utf-8"))
+        except metadata.PackageNotFoundError:
+            h.update(f"{dist}=?;".encode("utf-8"))
+    return h.digest()
+
+
+def _read_pdf_bytes(pdf_path: str) -> Optional[bytes]:
+    """Read a PDF for the cache key; None when caching is off or the file is unreadable."""
+    if not PARSE_CACHE_DIR:
+        return None
+    try:
+        with open(pdf_path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_cache_path(content: Optional[bytes], invoice_type: str) -> Optional[str]:
+    """Cache file for a PDF, keyed on its bytes, its invoice type and the parser version."""
+    if not PARSE_CACHE_DIR or content is None:
+        return None
+    fingerprint = _parser_fingerprint()
+    if fingerprint is None:
+        return None  # Can't tell parser builds apart, so stale results could be served
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{PARSE_CACHE_VERSION}:{invoice_type}:".encode("utf-8"))
+    h.update(fingerprint)
+    h.update(content)
+    return os.path.join(PARSE_CACHE_DIR, f"{h.hexdigest()}.json")
+
+
+def _load_cached_parse(path: Optional[str]) -> Optional[InvoiceData]:
+    """Return a previously cached parse result, or None on a miss."""
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = InvoiceData(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for _prune_parse_cache
+    except OSError:
+        pass
+    return data
+
+
+@lru_cache(maxsize=1)
+def _prune_parse_cache() -> None:
+    """Trim the cache to PARSE_CACHE_MAX_ENTRIES, least recently used first (once per process)."""
+    entries = []
+    try:
+        with os.scandir(PARSE_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # Removed by another worker meanwhile
+    except OSError:
+        return
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - PARSE_CACHE_MAX_ENTRIES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _store_cached_parse(path: Optional[str], data: InvoiceData) -> None:
+    """Save a parse result; caching failures are not fatal."""
+    if not path:
+        return
+    _prune_parse_cache()
+    try:
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=PARSE_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(data), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def parse_invoice(pdf_path: str) -> InvoiceData:
     """
     Parse an invoice PDF and extract structured data.
@@ -712,10 +990,7 @@ def parse_invoice(pdf_path: str) -> InvoiceData:
     Returns:
         InvoiceData object with extracted information
     """
-    import os
-    
     filename = os.path.basename(pdf_path)
-    invoice_type = detect_invoice_type(filename)
     
     # Skip credit notes
     if "CREDIT" in filename.upper():
@@ -723,30 +998,56 @@ def parse_invoice(pdf_path: str) -> InvoiceData:
         data.extraction_errors.append("Credit notes are not supported")
         return data
     
+    # Reject empty and non-PDF files by their header, as the GUI does, before
+    # pdfplumber gets to them; unreadable paths still raise from pdfplumber
+    header = _read_pdf_header(pdf_path)
+    if header is not None and b"%PDF-" not in header:
+        data = InvoiceData()
+        data.extraction_errors.append("Not a PDF file" if header else "Empty PDF file")
+        return data
+    
+    invoice_type = detect_invoice_type(filename)
+    
+    content = _read_pdf_bytes(pdf_path)
+    cache_path = _parse_cache_path(content, invoice_type)
+    data = _load_cached_parse(cache_path)
+    if data is not None:
+        return data
+    
+    # On a miss, parse the bytes already read for the cache key instead of reopening the file
+    source = io.BytesIO(content) if content is not None else pdf_path
+    data = _parse_pdf(source, invoice_type)
+    # Only clean results are kept; failures may be transient or fixed by a later release
+    if data.invoice_number and not data.extraction_errors:
+        _store_cached_parse(cache_path, data)
+    return data
+
+
+def _parse_pdf(pdf_path: Union[str, BinaryIO], invoice_type: str) -> InvoiceData:
+    """Extract the text of a PDF and run the matching airline parser over it."""
     # Extract text from first page only
     text = extract_text_from_pdf(pdf_path, page_num=0)
     
     if not text:
         data = InvoiceData()
-        data.extraction_errors.append("Could not extract text from PDF")
+        data.extraction_errors.append("Could not extract text from PDF (scanned or image-only?)")
         return data
     
-    # Try each parser
-    for parser in PARSERS:
-        if parser.can_parse(text):
-            data = parser.extract(text, invoice_type)
-            
-            # Validate required fields
-            if not data.invoice_number:
-                data.extraction_errors.append("Invoice number not found")
-            if not data.invoice_date:
-                data.extraction_errors.append("Invoice date not found")
-            if not data.customer_gstin:
-                data.extraction_errors.append("Customer GSTIN not found")
-            if data.total_amount == 0:
-                data.extraction_errors.append("Total amount not found or is zero")
-            
-            return data
+    parser = select_parser(text)
+    if parser:
+        data = parser.extract(text, invoice_type)
+        
+        # Validate required fields
+        if not data.invoice_number:
+            data.extraction_errors.append("Invoice number not found")
+        if not data.invoice_date:
+            data.extraction_errors.append("Invoice date not found")
+        if not data.customer_gstin:
+            data.extraction_errors.append("Customer GSTIN not found")
+        if data.total_amount == 0:
+            data.extraction_errors.append("Total amount not found or is zero")
+        
+        return data
     
     # No parser matched
     data = InvoiceData(raw_text=text)
@@ -754,6 +1055,36 @@ def parse_invoice(pdf_path: str) -> InvoiceData:
     return data
 
 
+def _parse_invoice_isolated(pdf_path: str) -> InvoiceData:
+    """parse_invoice for batch workers: an unreadable or corrupt PDF fails only itself."""
+    try:
+        return parse_invoice(pdf_path)
+    except Exception as e:
+        data = InvoiceData()
+        data.extraction_errors.append(f"Error reading PDF: {e}")
+        return data
+
+
+def parse_invoices(pdf_paths: List[str], workers: Optional[int] = None) -> List[InvoiceData]:
+    """
+    Parse several invoice PDFs across worker processes.
+    
+    Args:
+        pdf_paths: Paths to the PDF files
+        workers: Number of worker processes (default: one per CPU)
+        
+    Returns:
+        List of InvoiceData objects, in the same order as pdf_paths
+    """
+    if len(pdf_paths) < 2:
+        return [_parse_invoice_isolated(path) for path in pdf_paths]
+    
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps IPC low without leaving workers idle at the end
+    chunksize = max(1, len(pdf_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_invoice_isolated, pdf_paths, chunksize=chunksize))
+
 if __name__ == "__main__":
     # Test with sample invoice
     import sys
@@ -4,15 +4,22 @@ Invoice Parser Module for Airline PDF Invoices
 Extracts data from Air India, Air India Express, IndiGo, Akasa Air, and Gulf Air invoices.
 """
 
+import hashlib
+import io
+import json
+import os
 import re
+import sys
+import tempfile
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-import pdfplumber
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Pattern, Union, BinaryIO
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceData:
     """Structured invoice data extracted from PDF."""
     airline: str = ""
@@ -88,6 +95,105 @@ GSTIN_STATE_MAP = {
 }
 
 
+# Precompiled patterns, compiled once at import instead of per extract() call
+_AMOUNT_STRIP_RE = re.compile(r'[₹$,%\s]')
+
+# Shared across airlines
+_GSTIN = r'\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2}'  # 15-character GSTIN
+_GSTIN_RE = re.compile(rf'GSTIN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_GSTIN_OF_CUSTOMER_RE = re.compile(rf'GSTIN\s*of\s*Customer\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_GSTIN_CUSTOMER_NAME_RE = re.compile(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', re.IGNORECASE)
+_INVOICE_OR_DEBIT_NUMBER_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', re.IGNORECASE)
+_PNR_RE = re.compile(r'PNR\s*[:\s]*([A-Z0-9]{6})', re.IGNORECASE)
+_FLIGHT_FROM_RE = re.compile(r'Flight\s*From\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_GRAND_TOTAL_LINE_RE = re.compile(r'Grand\s*Total.*', re.IGNORECASE)
+_AMOUNT_2DP_RE = re.compile(r'(\d[\d,]*\.\d{2})')
+_SAC_TAXABLE_RE = re.compile(r'996425\s+(\d[\d,]*\.\d{2})')
+_AIRPORT_CHARGES_RE = re.compile(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', re.IGNORECASE)
+
+# Air India
+_AI_DATE_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', re.IGNORECASE)
+_AI_CUSTOMER_GSTIN_RE = re.compile(rf'Customer\s*GSTIN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AI_CUSTOMER_NAME_RE = re.compile(r'Customer\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)')
+_AI_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:MR|MS|MRS)?)', re.IGNORECASE)
+_AI_ROUTING_RE = re.compile(r'Routing\s*[:\s]*([A-Z]{6,})', re.IGNORECASE)
+_AI_TOTAL_RE = re.compile(r'(?:^|\n)Total\s+(\d[\d,]*\.?\d*)\s*$', re.MULTILINE)
+_AI_NON_TAXABLE_FARE_RE = re.compile(r'Non-taxable\s*fare\s*details\s*:\s*(.+)', re.IGNORECASE)
+
+# Air India Express
+_AIX_INVOICE_RE = re.compile(r'Invoice\s*Number\s*[:\s]*([A-Z0-9]+)', re.IGNORECASE)
+_AIX_VENDOR_GSTIN_RE = re.compile(rf'GSTN\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AIX_DATE_RE = re.compile(r'Invoice\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', re.IGNORECASE)
+_AIX_PNR_RE = re.compile(r'PNR\s*(?:No)?\s*[:\s]*([A-Z0-9]{6})', re.IGNORECASE)
+_AIX_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+)', re.IGNORECASE)
+_AIX_FLIGHT_TO_RE = re.compile(r'Flight\s*To\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_AIX_IGST_RE = re.compile(r'996425[^\n]*?(\d+)\s*%\s+(\d[\d,]*\.\d{2})')
+_AIX_AIRPORT_TAXES_RE = re.compile(r'Airport\s*Taxes[^\n]*?\s(\d[\d,]*\.\d{2})\s+(\d[\d,]*\.\d{2})', re.IGNORECASE)
+_AIX_NON_TAXABLE_RE = re.compile(r'Non\s*Taxable[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+
+# IndiGo
+_INDIGO_INVOICE_RE = re.compile(r'Number\s*[:\s]*([A-Z]{2}\d+[A-Z]{2}\d+)')
+_INDIGO_DATE_RE = re.compile(r'Date\s*[:\s]*(\d{1,2}[^\w\d]+[A-Za-z]{3}[^\w\d]+\d{4})', re.IGNORECASE)
+_INDIGO_DATE_SEP_RE = re.compile(r'[^\w\d]+')
+_INDIGO_PASSENGER_RE = re.compile(r'Passenger\s*Name\s*[:\s]*\n?([A-Za-z][A-Za-z\s]+)', re.IGNORECASE)
+_INDIGO_FROM_RE = re.compile(r'From\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_INDIGO_TO_RE = re.compile(r'(?<!From\s)To\s*[:\s]*([A-Z]{3})', re.IGNORECASE)
+_DIGIT_RE = re.compile(r'\d')
+
+# Numeric cells of a table row: amounts, plain integers and "N %" rates
+_NUM_TOKEN_RE = re.compile(r'\d[\d,]*(?:\.\d+)?(?:\s*%)?')
+
+# Akasa Air
+_AKASA_DATE_RE = re.compile(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}-[A-Za-z]{3}-\d{4})', re.IGNORECASE)
+_AKASA_CUSTOMER_GSTIN_RE = re.compile(rf'GSTIN[/\s]*Unique\s*ID\s*of\s*Customer\s*[:\s]*({_GSTIN})', re.IGNORECASE)
+_AKASA_CUSTOMER_NAME_RE = re.compile(r'Name\s*of\s*Customer\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', re.IGNORECASE)
+_AKASA_AMOUNT_RE = re.compile(r'(\d[\d,]*\.\d+)')
+_AKASA_IGST_RE = re.compile(r'5%\s+(\d[\d,]*\.\d{2})')
+_AKASA_CGST_SGST_RE = re.compile(r'2\.5%\s+(\d[\d,]*\.\d{2})\s+2\.5%\s+(\d[\d,]*\.\d{2})')
+
+# Gulf Air
+_GULF_INVOICE_RE = re.compile(r'Invoice\s*No\s*[:\s]*([A-Z0-9/]+)', re.IGNORECASE)
+_GULF_DATE_RE = re.compile(r'Invoice\s*Date\s*[:\s]*(\d{1,2}-\d{1,2}-\d{4})', re.IGNORECASE)
+_GULF_CUSTOMER_NAME_RE = re.compile(r'Customer\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', re.IGNORECASE)
+_GULF_TICKET_RE = re.compile(r'Ticket\s*/\s*Document\s*No\s*[:\s]*(\d+)', re.IGNORECASE)
+_GULF_TAXABLE_RE = re.compile(r'Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_NON_TAXABLE_RE = re.compile(r'Non-Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_TOTAL_RE = re.compile(r'Total\s*\(including\s*taxes\)[^\d]*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+_GULF_IGST_RE = re.compile(r'Integrated\s*Tax\s*\(IGST\)\s*(\d+)%\s*(\d[\d,]*\.?\d*)', re.IGNORECASE)
+
+# PDF text clean-up: numbers split across lines
+_SPLIT_NUMBER_RE = re.compile(r'(?<=\d\.)(\d?)\n(?=\d)')
+
+
+# Accepted invoice date formats, in priority order
+_DATE_FORMATS = (
+    "%d/%m/%Y",      # 15/05/2025
+    "%d-%m-%Y",      # 15-05-2025
+    "%d-%b-%Y",      # 15-May-2025
+    "%d-%B-%Y",      # 15-May-2025
+    "%Y-%m-%d",      # 2025-05-15
+    "%d %b %Y",      # 15 May 2025
+    "%d %B %Y",      # 15 May 2025
+)
+
+
+def _date_format_candidates(date_str: str) -> tuple:
+    """The one format this date's shape implies, followed by the rest as a fallback."""
+    if "/" in date_str:
+        likely = "%d/%m/%Y"
+    elif "-" in date_str:
+        parts = date_str.split("-")
+        if len(parts) == 3 and parts[1].isalpha():
+            likely = "%d-%b-%Y" if len(parts[1]) == 3 else "%d-%B-%Y"
+        else:
+            likely = "%Y-%m-%d" if len(parts[0]) == 4 else "%d-%m-%Y"
+    else:
+        parts = date_str.split()
+        likely = "%d %b %Y" if len(parts) == 3 and len(parts[1]) == 3 else "%d %B %Y"
+    return (likely,) + tuple(fmt for fmt in _DATE_FORMATS if fmt != likely)
+
+
+@lru_cache(maxsize=4096)  # Invoices in a batch share a handful of dates
 def parse_date_to_standard(date_str: str) -> str:
     """Convert various date formats to DD-MMM-YYYY format."""
     if not date_str:
@@ -95,19 +201,8 @@ def parse_date_to_standard(date_str: str) -> str:
     
     date_str = date_str.strip()
     
-    # Try different date formats
-    formats = [
-        "%d/%m/%Y",      # 15/05/2025
-        "%d-%m-%Y",      # 15-05-2025
-
-        "%d-%b-%Y",      # 15-May-2025
-        "%d-%B-%Y",      # 15-May-2025
-        "%Y-%m-%d",      # 2025-05-15
-        "%d %b %Y",      # 15 May 2025
-        "%d %B %Y",      # 15 May 2025
-    ]
-    
-    for fmt in formats:
+    # The shape picks the right format up front, so strptime rarely has to fail first
+    for fmt in _date_format_candidates(date_str):
         try:
             dt = datetime.strptime(date_str, fmt)
             return dt.strftime("%d-%b-%Y") # Title Case: 14-May-2025
@@ -122,8 +217,15 @@ def parse_amount(amount_str: str) -> float:
     if not amount_str:
         return 0.0
     
-    # Remove currency symbols, commas, percent, and whitespace
-    cleaned = re.sub(r'[₹$,%\s]', '', str(amount_str))
+    # Fast path: most amounts only carry thousands separators
+    cleaned = str(amount_str).replace(',', '')
+    try:
+        return float(cleaned)
+    except ValueError:
+        pass
+    
+    # Remove currency symbols, percent, and whitespace
+    cleaned = _AMOUNT_STRIP_RE.sub('', cleaned)
     
     try:
         return float(cleaned)
@@ -131,24 +233,45 @@ def parse_amount(amount_str: str) -> float:
         return 0.0
 
 
+
+def _line_at(text: str, pos: int) -> str:
+    """Return text from pos to the end of its line."""
+    end = text.find('\n', pos)
+    return text[pos:] if end < 0 else text[pos:end]
+
+
+def _row_tokens(line: str) -> List[str]:
+    """Split a table row into its numeric cells, normalising rates to e.g. '5%'."""
+    return [tok.replace(' ', '') for tok in _NUM_TOKEN_RE.findall(line)]
+
+
+def _is_amount(token: str) -> bool:
+    """True for decimal amount cells such as '3,962.00'."""
+    return '.' in token and not token.endswith('%')
+
+
 class BaseParser(ABC):
     """Abstract base class for airline invoice parsers."""
     
     airline_name: str = ""
+    # Upper-case text markers that identify this airline's invoices
+    markers: tuple = ()
+    # Upper-case markers of another airline that rule this one out
+    excludes: tuple = ()
     
-    @abstractmethod
     def can_parse(self, text: str) -> bool:
-        """Check if this parser can handle the given text."""
-        pass
+        """Check if this parser can handle the given text, on its own rather than by PARSERS priority."""
+        upper = text.upper()
+        return any(m in upper for m in self.markers) and not any(m in upper for m in self.excludes)
     
     @abstractmethod
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        """Extract invoice data from text."""
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        """Extract invoice data from text; keep the full text in raw_text only if include_raw."""
         pass
     
-    def _safe_search(self, pattern: str, text: str, group: int = 1, default: str = "") -> str:
-        """Safely search for a pattern and return the match or default."""
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+    def _safe_search(self, pattern: Pattern, text: str, group: int = 1, default: str = "") -> str:
+        """Safely search for a precompiled pattern and return the match or default."""
+        match = pattern.search(text)
         if match:
             try:
                 return match.group(group).strip()
@@ -156,7 +279,15 @@ class BaseParser(ABC):
                 return default
         return default
     
-    def _extract_gstin_state(self, gstin: str) -> tuple:
+    def _extract_customer_gstin(self, data: InvoiceData, pattern: Pattern, text: str) -> None:
+        """Fill customer GSTIN and the state derived from it, if the pattern matches."""
+        gstin_match = pattern.search(text)
+        if gstin_match:
+            data.customer_gstin = gstin_match.group(1)
+            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+    
+    @staticmethod
+    def _extract_gstin_state(gstin: str) -> tuple:
         """Extract state code and name from GSTIN."""
         if len(gstin) >= 2:
             state_code = gstin[:2]
@@ -169,52 +300,49 @@ class AirIndiaParser(BaseParser):
     """Parser for Air India and Air India LTD invoices."""
     
     airline_name = "AIR INDIA"
+    markers = ("AIR INDIA LTD",)
+    excludes = ("AIR INDIA EXPRESS",)
     
-    def can_parse(self, text: str) -> bool:
-        return "AIR INDIA LTD" in text.upper() and "AIR INDIA EXPRESS" not in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice/Debit Note Number - handle both formats
-        inv_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _INVOICE_OR_DEBIT_NUMBER_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Vendor GSTIN (Supplier) - usually first GSTIN occurrence
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         if vendor_match:
             data.vendor_gstin = vendor_match.group(1)
         
         # Invoice/Debit Note Date
-        date_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', text, re.IGNORECASE)
+        date_match = _AI_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'Customer\s*GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _AI_CUSTOMER_GSTIN_RE, text)
         
         # Customer Name - stop at newline or Reference
-        cust_match = re.search(r'Customer\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', text)
+        cust_match = _AI_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()  # Take only first line
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:MR|MS|MRS)?)', text, re.IGNORECASE)
+        pass_match = _AI_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # Routing
-        routing_match = re.search(r'Routing\s*[:\s]*([A-Z]{6,})', text, re.IGNORECASE)
+        routing_match = _AI_ROUTING_RE.search(text)
         if routing_match:
             routing = routing_match.group(1)
             if len(routing) >= 6:
@@ -223,43 +351,51 @@ class AirIndiaParser(BaseParser):
                 data.routing = f"{data.flight_from} TO {data.flight_to}"
         
         # Total Amount - look for the final "Total" line with amount at end
-        total_match = re.search(r'(?:^|\n)Total\s+(\d[\d,]*\.?\d*)\s*$', text, re.MULTILINE)
+        total_match = _AI_TOTAL_RE.search(text)
         if total_match:
             data.total_amount = parse_amount(total_match.group(1))
         
-        # Air India: 996425 row
+        # Air India: 996425 row, when the amounts share the SAC line
         # Pattern: 996425-...service 3,792.00 170.00 236.00 0.00 3,962.00 5 % 99.50 99.50 0.00 4,397.00
-        sac_line = re.search(r'996425[^\n]*?(\d[\d,]*\.\d+)\s+[\d,\.]+\s+[\d,\.]+\s+[\d,\.]+\s+(\d[\d,]*\.\d+)\s+\d+\s*%', text)
-        if sac_line:
-            data.taxable_value = parse_amount(sac_line.group(1))  # First amount after SAC
+        # Cells before the rate: taxable, other taxable, non-taxable, discount, net taxable
+        sac_pos = text.find('996425')
+        if sac_pos >= 0:
+            cells = _row_tokens(_line_at(text, sac_pos))[1:]
+            rate_idx = next((i for i, cell in enumerate(cells) if cell.endswith('%')), -1)
+            if rate_idx >= 5 and _is_amount(cells[rate_idx - 5]) and _is_amount(cells[rate_idx - 1]):
+                data.taxable_value = parse_amount(cells[rate_idx - 5])  # First amount after SAC
+                non_tax = parse_amount(cells[rate_idx - 3])
+                if non_tax > 0:
+                    data.non_taxable_value = non_tax
         
         # For Air India, parse tax from the table row ending with tax amounts
         # The 996425 row ends with: taxable 5% CGST SGST IGST Total
         # e.g., 3,962.00 5 % 99.50 99.50 0.00 4,397.00
-        tax_row = re.search(r'(\d[\d,]*\.\d+)\s+5\s*%\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)', text)
-        if tax_row:
-            data.taxable_value = parse_amount(tax_row.group(1))
-            data.cgst_amount = parse_amount(tax_row.group(2))
-            data.sgst_amount = parse_amount(tax_row.group(3))
-            data.igst_amount = parse_amount(tax_row.group(4))
-            data.total_amount = parse_amount(tax_row.group(5))
-            data.cgst_rate = 2.5 if data.cgst_amount > 0 else 0
-            data.sgst_rate = 2.5 if data.sgst_amount > 0 else 0
-            data.igst_rate = 5.0 if data.igst_amount > 0 else 0
-        
-        # Non-taxable value from SAC row (3rd amount column = non-taxable)
-        # Pattern: 996425-... 4,593.00 170.00 443.00 0.00 4,763.00 ...
-        non_tax_match = re.search(r'996425[^\n]*?\d[\d,]*\.\d{2}\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})\s+[\d,\.]+\s+\d[\d,]*\.\d{2}\s+\d+\s*%', text)
-        if non_tax_match:
-            non_tax = parse_amount(non_tax_match.group(1))
-            if non_tax > 0:
-                data.non_taxable_value = non_tax
+        for line in text.split('\n'):
+            if '%' not in line:
+                continue
+            cells = _row_tokens(line)
+            rate_idx = next(
+                (i for i in range(1, len(cells) - 4)
+                 if cells[i] == '5%' and all(_is_amount(c) for c in cells[i - 1:i] + cells[i + 1:i + 5])),
+                -1,
+            )
+            if rate_idx > 0:
+                data.taxable_value = parse_amount(cells[rate_idx - 1])
+                data.cgst_amount = parse_amount(cells[rate_idx + 1])
+                data.sgst_amount = parse_amount(cells[rate_idx + 2])
+                data.igst_amount = parse_amount(cells[rate_idx + 3])
+                data.total_amount = parse_amount(cells[rate_idx + 4])
+                data.cgst_rate = 2.5 if data.cgst_amount > 0 else 0
+                data.sgst_rate = 2.5 if data.sgst_amount > 0 else 0
+                data.igst_rate = 5.0 if data.igst_amount > 0 else 0
+                break
         
         # Fallback: "Non-taxable fare details: P2 = 236.00; IN = 207.00"
         if data.non_taxable_value == 0:
-            non_tax_line = re.search(r'Non-taxable\s*fare\s*details\s*:\s*(.+)', text, re.IGNORECASE)
+            non_tax_line = _AI_NON_TAXABLE_FARE_RE.search(text)
             if non_tax_line:
-                amounts = re.findall(r'(\d[\d,]*\.\d{2})', non_tax_line.group(1))
+                amounts = _AMOUNT_2DP_RE.findall(non_tax_line.group(1))
                 if amounts:
                     data.non_taxable_value = sum(parse_amount(a) for a in amounts)
         
@@ -270,52 +406,48 @@ class AirIndiaExpressParser(BaseParser):
     """Parser for Air India Express invoices."""
     
     airline_name = "AIR INDIA EXPRESS"
+    markers = ("AIR INDIA EXPRESS",)
     
-    def can_parse(self, text: str) -> bool:
-        return "AIR INDIA EXPRESS" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number
-        inv_match = re.search(r'Invoice\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _AIX_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
             
         # Vendor GSTIN (Supplier) - AI Express uses "GSTN"
-        vendor_match = re.search(r'GSTN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _AIX_VENDOR_GSTIN_RE.search(text)
         if vendor_match:
             data.vendor_gstin = vendor_match.group(1)
         
         # Invoice Date
-        date_match = re.search(r'Invoice\s*Date\s*[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})', text, re.IGNORECASE)
+        date_match = _AIX_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _GSTIN_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             data.customer_name = cust_match.group(1).strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*(?:No)?\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _AIX_PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+)', text, re.IGNORECASE)
+        pass_match = _AIX_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # Flight From/To
-        from_match = re.search(r'Flight\s*From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
-        to_match = re.search(r'Flight\s*To\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _FLIGHT_FROM_RE.search(text)
+        to_match = _AIX_FLIGHT_TO_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
         if to_match:
@@ -325,33 +457,33 @@ class AirIndiaExpressParser(BaseParser):
         
         # Total from Grand Total line (last amount)
         # Grand Total 31,451.42 1,772.00 33,223.42 1,572.58 34,796.00
-        grand_total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        grand_total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if grand_total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d{2})', grand_total_line.group(0))
+            amounts = _AMOUNT_2DP_RE.findall(grand_total_line.group(0))
             if amounts:
                 data.total_amount = parse_amount(amounts[-1])  # Last amount = grand total
         
         # Extract from SAC 996425 row:
         # Air Ticket charges 996425 31,451.42 - 31,451.42 5 % 1,572.58 33,024.00
-        sac_row = re.search(r'996425\s+(\d[\d,]*\.\d{2})', text)
+        sac_row = _SAC_TAXABLE_RE.search(text)
         if sac_row:
             data.taxable_value = parse_amount(sac_row.group(1))
         
         # IGST from SAC row: "5 % 1,572.58"
-        igst_match = re.search(r'996425[^\n]*?(\d+)\s*%\s+(\d[\d,]*\.\d{2})', text)
+        igst_match = _AIX_IGST_RE.search(text)
         if igst_match:
             data.igst_rate = parse_amount(igst_match.group(1))
             data.igst_amount = parse_amount(igst_match.group(2))
         
         # Non-taxable: Airport Taxes-Pass Through
         # Pattern: "Airport Taxes-Pass Through - - 1,772.00 1,772.00 ..."
-        airport_match = re.search(r'Airport\s*Taxes[^\n]*?\s(\d[\d,]*\.\d{2})\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIX_AIRPORT_TAXES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
         # Fallback: look for "Non Taxable" or "Exempt" value in the table
         if data.non_taxable_value == 0:
-            non_tax_match = re.search(r'Non\s*Taxable[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+            non_tax_match = _AIX_NON_TAXABLE_RE.search(text)
             if non_tax_match:
                 val = parse_amount(non_tax_match.group(1))
                 if val > 0:
@@ -364,15 +496,14 @@ class IndiGoParser(BaseParser):
     """Parser for IndiGo (InterGlobe Aviation) invoices."""
     
     airline_name = "INDIGO"
+    markers = ("INDIGO", "INTERGLOBE AVIATION")
     
-    def can_parse(self, text: str) -> bool:
-        return "INDIGO" in text.upper() or "INTERGLOBE AVIATION" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number (format: KA1252612CR78975)
-        inv_match = re.search(r'Number\s*[:\s]*([A-Z]{2}\d+[A-Z]{2}\d+)', text)
+        inv_match = _INDIGO_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
@@ -382,22 +513,22 @@ class IndiGoParser(BaseParser):
         # [^\w\d]+ : One or more non-alphanumeric chars as separator
         # [A-Za-z]{3} : 3-letter month
         # \d{4} : 4-digit year
-        date_match = re.search(r'Date\s*[:\s]*(\d{1,2}[^\w\d]+[A-Za-z]{3}[^\w\d]+\d{4})', text, re.IGNORECASE)
+        date_match = _INDIGO_DATE_RE.search(text)
         if date_match:
             # Normalize to standard format: replace spaces/separators with single dash
-            raw_date = re.sub(r'[^\w\d]+', '-', date_match.group(1))
+            raw_date = _INDIGO_DATE_SEP_RE.sub('-', date_match.group(1))
             data.invoice_date = parse_date_to_standard(raw_date)
         
             data.invoice_date = parse_date_to_standard(raw_date)
         
         # Vendor GSTIN (Supplier) - appears before Customer GSTIN
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         # Ensure it's not the customer one if they appear close
         if vendor_match and "Customer" not in text[vendor_match.start()-20:vendor_match.start()]: 
              data.vendor_gstin = vendor_match.group(1)
         elif vendor_match:
              # Fallback: Find first GSTIN that is NOT followed by "of Customer" or preceded by "Customer"
-             all_matches = re.finditer(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+             all_matches = _GSTIN_RE.finditer(text)
              for m in all_matches:
                  start, end = m.span()
                  context = text[max(0, start-30):end+30]
@@ -406,30 +537,27 @@ class IndiGoParser(BaseParser):
                      break
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'GSTIN\s*Customer\s*Name\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _GSTIN_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Passenger Name - specific to IndiGo format
-        pass_match = re.search(r'Passenger\s*Name\s*[:\s]*\n?([A-Za-z][A-Za-z\s]+)', text, re.IGNORECASE)
+        pass_match = _INDIGO_PASSENGER_RE.search(text)
         if pass_match:
             data.passenger_name = pass_match.group(1).strip()
         
         # From/To
-        from_match = re.search(r'From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
-        to_match = re.search(r'(?<!From\s)To\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _INDIGO_FROM_RE.search(text)
+        to_match = _INDIGO_TO_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
         if to_match:
@@ -439,9 +567,9 @@ class IndiGoParser(BaseParser):
         
         # Grand Total - IndiGo format: Grand Total 0 974.00 0 304.00 0.00 0.00 0.00 7,367.00
         # Need to capture the last number on the line
-        total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d{2})', total_line.group(0))
+            amounts = _AMOUNT_2DP_RE.findall(total_line.group(0))
             if amounts:
                 data.total_amount = parse_amount(amounts[-1])  # Take last amount
         
@@ -456,7 +584,7 @@ class IndiGoParser(BaseParser):
                 try:
                     start_idx = [k for k, p in enumerate(raw_parts) if '996425' in p][0]
                     candidate = raw_parts[start_idx:]
-                    while candidate and not re.search(r'\d', candidate[-1]):
+                    while candidate and not _DIGIT_RE.search(candidate[-1]):
                         candidate.pop()
                 except IndexError:
                     continue
@@ -545,7 +673,7 @@ class IndiGoParser(BaseParser):
         
         # Airport Charges (Non-taxable / Exempted)
         # Pattern: "Airport Charges   0.00   974.00   974.00 ..."
-        airport_match = re.search(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIRPORT_CHARGES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
@@ -556,25 +684,24 @@ class AkasaAirParser(BaseParser):
     """Parser for Akasa Air (SNV Aviation) invoices."""
     
     airline_name = "AKASA AIR"
+    markers = ("AKASA", "SNV AVIATION")
     
-    def can_parse(self, text: str) -> bool:
-        return "AKASA" in text.upper() or "SNV AVIATION" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice/Debit Note Number
-        inv_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Number\s*[:\s]*([A-Z0-9]+)', text, re.IGNORECASE)
+        inv_match = _INVOICE_OR_DEBIT_NUMBER_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Invoice/Debit Note Date (format: 22-Oct-2025)
-        date_match = re.search(r'(?:Invoice|Debit\s*Note)\s*Date\s*[:\s]*(\d{1,2}-[A-Za-z]{3}-\d{4})', text, re.IGNORECASE)
+        date_match = _AKASA_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Vendor GSTIN (Supplier)
-        vendor_match = re.search(r'GSTIN\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
+        vendor_match = _GSTIN_RE.search(text)
         # Ensure it's not the customer one (Customer one is usually "GSTIN/Unique ID of Customer")
         if vendor_match and "Customer" not in text[vendor_match.start():vendor_match.end()+20]:
              data.vendor_gstin = vendor_match.group(1)
@@ -584,24 +711,21 @@ class AkasaAirParser(BaseParser):
                  data.vendor_gstin = vendor_match.group(1)
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN[/\s]*Unique\s*ID\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _AKASA_CUSTOMER_GSTIN_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'Name\s*of\s*Customer\s*[:\s]*([A-Za-z][A-Za-z\s]+(?:Pvt|Private)?\s*(?:Ltd|Limited)?)', text, re.IGNORECASE)
+        cust_match = _AKASA_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # PNR
-        pnr_match = re.search(r'PNR\s*[:\s]*([A-Z0-9]{6})', text, re.IGNORECASE)
+        pnr_match = _PNR_RE.search(text)
         if pnr_match:
             data.pnr = pnr_match.group(1)
         
         # Flight From
-        from_match = re.search(r'Flight\s*From\s*[:\s]*([A-Z]{3})', text, re.IGNORECASE)
+        from_match = _FLIGHT_FROM_RE.search(text)
         if from_match:
             data.flight_from = from_match.group(1)
             data.routing = f"{data.flight_from}"
@@ -609,9 +733,9 @@ class AkasaAirParser(BaseParser):
         # Grand Total - Akasa format: last amount on the line is the grand total
         # Grand Total 10518.00 1018.00 398.00 11138.00 0.00 0.00 506.00 11644.00
         # Columns: [0]Taxable [1]NonTax [2]Discount [3]TaxableTotal [4]CGST [5]SGST [6]IGST [7]GrandTotal
-        grand_total_line = re.search(r'Grand\s*Total.*', text, re.IGNORECASE)
+        grand_total_line = _GRAND_TOTAL_LINE_RE.search(text)
         if grand_total_line:
-            amounts = re.findall(r'(\d[\d,]*\.\d+)', grand_total_line.group(0))
+            amounts = _AKASA_AMOUNT_RE.findall(grand_total_line.group(0))
             if len(amounts) >= 8:
                 # With Discount column: [0]Gross [1]NonTax [2]Discount [3]NetTotal [4]CGST [5]SGST [6]IGST [7]GrandTotal
                 data.non_taxable_value = parse_amount(amounts[1])
@@ -640,31 +764,34 @@ class AkasaAirParser(BaseParser):
         # Akasa table: SAC Taxable NonTax Discount Total Rate Amount...
         # Only parse if we didn't get data from Grand Total line
         if data.total_amount == 0:
-            akasa_row = re.search(r'996425\s+(\d[\d,]*\.\d+)\s+[\d,\.]+\s+[\d,\.]+\s+(\d[\d,]*\.\d+)[^\d]+\d+%[^\d]+[\d,\.]+[^\d]+\d+%[^\d]+[\d,\.]+[^\d]+5%\s+(\d[\d,]*\.\d+)\s+(\d[\d,]*\.\d+)', text)
-            if akasa_row:
-                data.taxable_value = parse_amount(akasa_row.group(1))
-                # taxable after discount in group 2
-                data.igst_amount = parse_amount(akasa_row.group(3))
+            # Cells: Taxable NonTax Discount Total CGST% CGST SGST% SGST IGST% IGST Total
+            sac_pos = text.find('996425')
+            cells = _row_tokens(_line_at(text, sac_pos))[1:] if sac_pos >= 0 else []
+            if (len(cells) >= 11 and cells[4].endswith('%') and cells[6].endswith('%')
+                    and cells[8] == '5%' and _is_amount(cells[0]) and _is_amount(cells[9])):
+                data.taxable_value = parse_amount(cells[0])
+                # taxable after discount in cells[3]
+                data.igst_amount = parse_amount(cells[9])
                 # Don't overwrite total_amount here - Grand Total (line 472) has the correct full total
                 data.igst_rate = 5.0
             else:
                 # Fallback: simpler pattern
-                taxable_match = re.search(r'996425\s+(\d[\d,]*\.\d{2})', text)
+                taxable_match = _SAC_TAXABLE_RE.search(text)
                 if taxable_match:
                     data.taxable_value = parse_amount(taxable_match.group(1))
-                igst_match = re.search(r'5%\s+(\d[\d,]*\.\d{2})', text)
+                igst_match = _AKASA_IGST_RE.search(text)
                 if igst_match:
                     data.igst_amount = parse_amount(igst_match.group(1))
                     data.igst_rate = 5.0
         
         # Airport Charges (Non-taxable)
         # Pattern: "Airport Charges   0.00   443.00   0.00   443.00 ..."
-        airport_match = re.search(r'Airport\s*Charges\s+[\d,\.]+\s+(\d[\d,]*\.\d{2})', text, re.IGNORECASE)
+        airport_match = _AIRPORT_CHARGES_RE.search(text)
         if airport_match:
             data.non_taxable_value = parse_amount(airport_match.group(1))
         
         # CGST/SGST for intra-state (e.g., Maharashtra)
-        cgst_match = re.search(r'2\.5%\s+(\d[\d,]*\.\d{2})\s+2\.5%\s+(\d[\d,]*\.\d{2})', text)
+        cgst_match = _AKASA_CGST_SGST_RE.search(text)
         if cgst_match:
             data.cgst_amount = parse_amount(cgst_match.group(1))
             data.sgst_amount = parse_amount(cgst_match.group(2))
@@ -680,57 +807,53 @@ class GulfAirParser(BaseParser):
     """Parser for Gulf Air invoices."""
     
     airline_name = "GULF AIR"
+    markers = ("GULF AIR",)
     
-    def can_parse(self, text: str) -> bool:
-        return "GULF AIR" in text.upper()
-    
-    def extract(self, text: str, invoice_type: str) -> InvoiceData:
-        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type, raw_text=text)
+    def extract(self, text: str, invoice_type: str, include_raw: bool = False) -> InvoiceData:
+        data = InvoiceData(airline=self.airline_name, invoice_type=invoice_type,
+                           raw_text=text if include_raw else "")
         
         # Invoice Number (format: TKMHP/2510/04496)
-        inv_match = re.search(r'Invoice\s*No\s*[:\s]*([A-Z0-9/]+)', text, re.IGNORECASE)
+        inv_match = _GULF_INVOICE_RE.search(text)
         if inv_match:
             data.invoice_number = inv_match.group(1).strip()
         
         # Invoice Date (format: 21-10-2025)
-        date_match = re.search(r'Invoice\s*Date\s*[:\s]*(\d{1,2}-\d{1,2}-\d{4})', text, re.IGNORECASE)
+        date_match = _GULF_DATE_RE.search(text)
         if date_match:
             data.invoice_date = parse_date_to_standard(date_match.group(1))
         
         # Customer GSTIN
-        gstin_match = re.search(r'GSTIN\s*of\s*Customer\s*[:\s]*(\d{2}[A-Z]{5}\d{4}[A-Z]\d[A-Z\d]{2})', text, re.IGNORECASE)
-        if gstin_match:
-            data.customer_gstin = gstin_match.group(1)
-            data.state_code, data.place_of_supply = self._extract_gstin_state(data.customer_gstin)
+        self._extract_customer_gstin(data, _GSTIN_OF_CUSTOMER_RE, text)
         
         # Customer Name
-        cust_match = re.search(r'Customer\s*Name\s*[:\s]*([A-Z][A-Z\s]+(?:PRIVATE\s+)?(?:LIMITED|LTD)?)', text, re.IGNORECASE)
+        cust_match = _GULF_CUSTOMER_NAME_RE.search(text)
         if cust_match:
             name = cust_match.group(1).strip()
             data.customer_name = name.split('\n')[0].strip()
         
         # Ticket Number as PNR alternative
-        ticket_match = re.search(r'Ticket\s*/\s*Document\s*No\s*[:\s]*(\d+)', text, re.IGNORECASE)
+        ticket_match = _GULF_TICKET_RE.search(text)
         if ticket_match:
             data.pnr = ticket_match.group(1)
         
         # Taxable Value
-        taxable_match = re.search(r'Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        taxable_match = _GULF_TAXABLE_RE.search(text)
         if taxable_match:
             data.taxable_value = parse_amount(taxable_match.group(1))
         
         # Non-Taxable Value
-        non_taxable_match = re.search(r'Non-Taxable\s*Value[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        non_taxable_match = _GULF_NON_TAXABLE_RE.search(text)
         if non_taxable_match:
             data.non_taxable_value = parse_amount(non_taxable_match.group(1))
         
         # Total Value
-        total_match = re.search(r'Total\s*\(including\s*taxes\)[^\d]*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        total_match = _GULF_TOTAL_RE.search(text)
         if total_match:
             data.total_amount = parse_amount(total_match.group(1))
         
         # IGST (Gulf Air typically uses 18% for international)
-        igst_match = re.search(r'Integrated\s*Tax\s*\(IGST\)\s*(\d+)%\s*(\d[\d,]*\.?\d*)', text, re.IGNORECASE)
+        igst_match = _GULF_IGST_RE.search(text)
         if igst_match:
             data.igst_rate = parse_amount(igst_match.group(1))
             data.igst_amount = parse_amount(igst_match.group(2))
@@ -747,40 +870,187 @@ PARSERS = [
     GulfAirParser(),
 ]
 
+# One case-insensitive pass finds every airline marker without an upper-cased copy of the text
+_AIRLINE_DISPATCH_RE = re.compile(
+    "|".join(re.escape(marker) for parser in PARSERS for marker in parser.markers),
+    re.IGNORECASE,
+)
+_PARSER_BY_MARKER = {marker: parser for parser in PARSERS for marker in parser.markers}
+
+
+def select_parser(text: str) -> Optional[BaseParser]:
+    """Return the highest-priority parser whose marker appears in the text, if any."""
+    found = {_PARSER_BY_MARKER.get(m.upper()) for m in _AIRLINE_DISPATCH_RE.findall(text)}
+    for parser in PARSERS:
+        if parser in found:
+            return parser
+    return None
+
+
+def _read_pdf_header(path: str) -> Optional[bytes]:
+    """First KiB of a file, where the spec allows the %PDF- header to sit; None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(1024)
+    except OSError:
+        return None
+
+
+def is_pdf_file(path: str) -> bool:
+    """Cheap magic-byte check, shared by the GUI and parse_invoice."""
+    header = _read_pdf_header(path)
+    return header is not None and b"%PDF-" in header
+
 
 def detect_invoice_type(filename: str) -> str:
     """Detect invoice type from filename."""
     filename_upper = filename.upper()
     if "DEBIT" in filename_upper:
         return "DEBIT"
-    elif "TAX_INVOICE" in filename_upper or "INVOICE" in filename_upper:
+    elif "INVOICE" in filename_upper:  # Also covers "TAX_INVOICE"
         return "TAX_INVOICE"
     return "UNKNOWN"
 
 
-def extract_text_from_pdf(pdf_path: str, page_num: int = None) -> str:
-    """Extract text from PDF. If page_num is None, extracts all pages."""
+def extract_text_from_pdf(pdf_path: Union[str, BinaryIO], page_num: int = None) -> str:
+    """Extract text from a PDF path or binary stream. If page_num is None, extracts all pages."""
+    import pdfplumber  # Deferred so the GUI window appears before the PDF stack loads
+    
     text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        if page_num is not None:
-            if page_num < len(pdf.pages):
-                pages = [pdf.pages[page_num]]
-            else:
-                pages = []
-        else:
-            pages = pdf.pages
-            
-        for page in pages:
+    # With a page number, only that page is built; later pages are never parsed
+    pages = [page_num + 1] if page_num is not None else None
+    with pdfplumber.open(pdf_path, pages=pages) as pdf:
+        for page in pdf.pages:
+            # Scanned/image-only pages have no text layer; skip the layout pass
+            if not page.chars:
+                continue
             t = page.extract_text(x_tolerance=1)
             if t:
                 # Fix numbers split across lines by PDF extraction
                 # e.g., "10,864.0\n0" -> "10,864.00" or "11,838.\n00" -> "11,838.00"
-                t = re.sub(r'(\d\.\d)\n(\d)', r'\1\2', t)
-                t = re.sub(r'(\d\.)\n(\d)', r'\1\2', t)
+                t = _SPLIT_NUMBER_RE.sub(r'\1', t)
                 text += t + "\n"
     return text
 
 
+# Parsed results are cached on disk by PDF content, so re-running a batch skips
+# PDF decoding and regex work. Entries hold invoice details (customer names, GSTINs,
+# passengers): the MMT_PARSE_CACHE_DIR environment variable moves the cache, or
+# disables it when set to an empty value. Set PARSE_CACHE_DIR to None to disable.
+PARSE_CACHE_DIR = os.environ.get(
+    "MMT_PARSE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mmt_parse_consolidated")
+) or None
+
+# Least recently used entries beyond this are removed, so the cache stays bounded
+PARSE_CACHE_MAX_ENTRIES = 2000
+
+# Bump when parsing changes in a way the build fingerprint cannot see
+PARSE_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=1)
+def _parser_fingerprint() -> Optional[bytes]:
+    """Identify this parser build, so cached results expire on upgrade; None if unknown."""
+    if getattr(sys, "frozen", False):
+        # Bundled exe: the module source is not on disk, so key on the executable itself
+        try:
+            st = os.stat(sys.executable)
+        except OSError:
+            return None
+        return f"{sys.executable}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8")
+    try:
+        with open(__file__, "rb") as f:
+            h = hashlib.blake2b(f.read(), digest_size=16)
+    except OSError:
+        return None
+    # The text extractor's version matters too: an upgrade can change the text the parsers see.
+    # Read from package metadata so a cache hit never has to import pdfplumber.
+    from importlib import metadata
+    for dist in ("pdfplumber", "pdfminer.six"):
+        try:
+            h.update(f"{dist}={metadata.version(dist)};".encode("utf-8"))
+        except metadata.PackageNotFoundError:
+            h.update(f"{dist}=?;".encode("utf-8"))
+    return h.digest()
+
+
+def _read_pdf_bytes(pdf_path: str) -> Optional[bytes]:
+    """Read a PDF for the cache key; None when caching is off or the file is unreadable."""
+    if not PARSE_CACHE_DIR:
+        return None
+    try:
+        with open(pdf_path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_cache_path(content: Optional[bytes], invoice_type: str) -> Optional[str]:
+    """Cache file for a PDF, keyed on its bytes, its invoice type and the parser version."""
+    if not PARSE_CACHE_DIR or content is None:
+        return None
+    fingerprint = _parser_fingerprint()
+    if fingerprint is None:
+        return None  # Can't tell parser builds apart, so stale results could be served
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{PARSE_CACHE_VERSION}:{invoice_type}:".encode("utf-8"))
+    h.update(fingerprint)
+    h.update(content)
+    return os.path.join(PARSE_CACHE_DIR, f"{h.hexdigest()}.json")
+
+
+def _load_cached_parse(path: Optional[str]) -> Optional[InvoiceData]:
+    """Return a previously cached parse result, or None on a miss."""
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = InvoiceData(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for _prune_parse_cache
+    except OSError:
+        pass
+    return data
+
+
+@lru_cache(maxsize=1)
+def _prune_parse_cache() -> None:
+    """Trim the cache to PARSE_CACHE_MAX_ENTRIES, least recently used first (once per process)."""
+    entries = []
+    try:
+        with os.scandir(PARSE_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # Removed by another worker meanwhile
+    except OSError:
+        return
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - PARSE_CACHE_MAX_ENTRIES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _store_cached_parse(path: Optional[str], data: InvoiceData) -> None:
+    """Save a parse result; caching failures are not fatal."""
+    if not path:
+        return
+    _prune_parse_cache()
+    try:
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=PARSE_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(data), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def parse_invoice(pdf_path: str) -> InvoiceData:
     """
     Parse an invoice PDF and extract structured data.
@@ -791,10 +1061,7 @@ def parse_invoice(pdf_path: str) -> InvoiceData:
     Returns:
         InvoiceData object with extracted information
     """
-    import os
-    
     filename = os.path.basename(pdf_path)
-    invoice_type = detect_invoice_type(filename)
     
     # Skip credit notes
     if "CREDIT" in filename.upper():
@@ -802,37 +1069,96 @@ def parse_invoice(pdf_path: str) -> InvoiceData:
         data.extraction_errors.append("Credit notes are not supported")
         return data
     
+    # Reject empty and non-PDF files by their header, as the GUI does, before
+    # pdfplumber gets to them; unreadable paths still raise from pdfplumber
+    header = _read_pdf_header(pdf_path)
+    if header is not None and b"%PDF-" not in header:
+        data = InvoiceData()
+        data.extraction_errors.append("Not a PDF file" if header else "Empty PDF file")
+        return data
+    
+    invoice_type = detect_invoice_type(filename)
+    
+    content = _read_pdf_bytes(pdf_path)
+    cache_path = _parse_cache_path(content, invoice_type)
+    data = _load_cached_parse(cache_path)
+    if data is not None:
+        if data.filename:
+            data.filename = filename  # Same content may arrive under another name
+        return data
+    
+    # On a miss, parse the bytes already read for the cache key instead of reopening the file
+    source = io.BytesIO(content) if content is not None else pdf_path
+    data = _parse_pdf(source, filename, invoice_type)
+    # Only clean results are kept; failures may be transient or fixed by a later release
+    if data.invoice_number and not data.extraction_errors:
+        _store_cached_parse(cache_path, data)
+    return data
+
+
+def _parse_pdf(pdf_path: Union[str, BinaryIO], filename: str, invoice_type: str) -> InvoiceData:
+    """Extract the text of a PDF and run the matching airline parser over it."""
     # Extract text from all pages to handle duplicates/split content
     text = extract_text_from_pdf(pdf_path, page_num=None)
     
     if not text:
         data = InvoiceData()
-        data.extraction_errors.append("Could not extract text from PDF")
+        data.extraction_errors.append("Could not extract text from PDF (scanned or image-only?)")
         return data
     
-    # Try each parser
-    for parser in PARSERS:
-        if parser.can_parse(text):
-            data = parser.extract(text, invoice_type)
-            data.filename = filename # Set filename
-            
-            # Validate required fields
-            if not data.invoice_number:
-                data.extraction_errors.append("Invoice number not found")
-            if not data.invoice_date:
-                data.extraction_errors.append("Invoice date not found")
-            if not data.customer_gstin:
-                data.extraction_errors.append("Customer GSTIN not found")
-            if data.total_amount == 0:
-                data.extraction_errors.append("Total amount not found or is zero")
-            
-            return data
+    parser = select_parser(text)
+    if parser:
+        data = parser.extract(text, invoice_type)
+        data.filename = filename # Set filename
+        
+        # Validate required fields
+        if not data.invoice_number:
+            data.extraction_errors.append("Invoice number not found")
+        if not data.invoice_date:
+            data.extraction_errors.append("Invoice date not found")
+        if not data.customer_gstin:
+            data.extraction_errors.append("Customer GSTIN not found")
+        if data.total_amount == 0:
+            data.extraction_errors.append("Total amount not found or is zero")
+        
+        return data
     
     # No parser matched
     data = InvoiceData(raw_text=text)
     data.filename = filename # Set filename
     data.extraction_errors.append(f"Unknown invoice format - no parser matched")
     return data
+
+
+def _parse_invoice_isolated(pdf_path: str) -> InvoiceData:
+    """parse_invoice for batch workers: an unreadable or corrupt PDF fails only itself."""
+    try:
+        return parse_invoice(pdf_path)
+    except Exception as e:
+        data = InvoiceData(filename=os.path.basename(pdf_path))
+        data.extraction_errors.append(f"Error reading PDF: {e}")
+        return data
+
+
+def parse_invoices(pdf_paths: List[str], workers: Optional[int] = None) -> List[InvoiceData]:
+    """
+    Parse several invoice PDFs across worker processes.
+    
+    Args:
+        pdf_paths: Paths to the PDF files
+        workers: Number of worker processes (default: one per CPU)
+        
+    Returns:
+        List of InvoiceData objects, in the same order as pdf_paths
+    """
+    if len(pdf_paths) < 2:
+        return [_parse_invoice_isolated(path) for path in pdf_paths]
+    
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps IPC low without leaving workers idle at the end
+    chunksize = max(1, len(pdf_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_invoice_isolated, pdf_paths, chunksize=chunksize))
  
 
 
@@ -846,7 +1172,10 @@ Generates CSV files matching the 41-column template format.
 
 import csv
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -902,8 +1231,26 @@ CUSTOMER_GSTIN_MAP = {
     "27AACCN5739J2Z3": "ISD"
 }
 
+
+# GSTIN -> branch, memoised (only a handful of distinct GSTINs per batch)
+@lru_cache(maxsize=2048)
+def _customer_branch(gstin: str) -> str:
+    """Branch for a customer GSTIN, falling back to its state code."""
+    if not gstin:
+        return ""
+    return CUSTOMER_GSTIN_MAP.get(gstin) or STATE_TO_BRANCH.get(gstin[:2], "")
+
+
+@lru_cache(maxsize=2048)
+def _vendor_branch(gstin: str) -> str:
+    """Organization branch for a vendor GSTIN, falling back to its state code."""
+    if not gstin:
+        return ""
+    return VENDOR_GSTIN_MAP.get(gstin) or STATE_TO_BRANCH.get(gstin[:2], "")
+
+
 # 41 CSV Headers matching the template
-CSV_HEADERS = [
+CSV_HEADERS = (
     "Entry Date",           # 1
     "Posting Date",         # 2
     "Organization",         # 3
@@ -945,7 +1292,19 @@ CSV_HEADERS = [
     "WH Tax Amount",        # 39
     "Round Off",            # 40
     "CC Code",              # 41
-]
+)
+assert len(CSV_HEADERS) == 41
+
+# Write buffer for CSV output files (rows are flushed in one writerows() call)
+CSV_WRITE_BUFFER = 1 << 20
+
+# Maximum number of group CSV files written concurrently
+CSV_WRITE_WORKERS = 8
+
+# Column positions read back from row tuples for the validation summary
+_ORG_BRANCH_COL = CSV_HEADERS.index("Organization Branch")
+_BRANCH_COL = CSV_HEADERS.index("Branch")
+_AMOUNT_COL = CSV_HEADERS.index("Amount")
 
 
 def get_current_date_formatted() -> str:
@@ -953,6 +1312,7 @@ def get_current_date_formatted() -> str:
     return datetime.now().strftime("%d-%b-%Y") # Title Case
 
 
+@lru_cache(maxsize=64)
 def map_airline_to_organization(airline: str) -> str:
     """Map airline name to organization name for the template."""
     airline_upper = airline.upper()
@@ -969,18 +1329,12 @@ def map_airline_to_organization(airline: str) -> str:
     return airline_upper
 
 
-def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str = "") -> str:
-    """Generate narration text for the CSV."""
-    org = map_airline_to_organization(airline)
-    
-    if routing:
-        route_text = routing.replace(" TO ", " TO ")
-    else:
-        route_text = ""
-    
+@lru_cache(maxsize=1024)
+def _build_narration(org: str, routing: str, pnr: str = "", passenger: str = "") -> str:
+    """Build narration text from an already mapped organization name."""
     narration = f"BEING AMOUNT PAYABLE TO {org}"
-    if route_text:
-        narration += f" FROM {route_text}"
+    if routing:
+        narration += f" FROM {routing}"
     if pnr:
         narration += f" PNR:{pnr}"
     if passenger:
@@ -989,54 +1343,118 @@ def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str
     return narration
 
 
-def invoice_to_csv_row(
+def generate_narration(airline: str, routing: str, pnr: str = "", passenger: str = "") -> str:
+    """Generate narration text for the CSV."""
+    return _build_narration(map_airline_to_organization(airline), routing, pnr, passenger)
+
+
+def _row_template(is_non_taxable: bool) -> tuple:
+    """Build the constant columns of a CSV row; per-invoice columns are left blank."""
+    row = dict.fromkeys(CSV_HEADERS, "")
+    row["ExchRate"] = "1"
+    row[" Charge Narration"] = "AIRPORT CHARGES" if is_non_taxable else "BASE FARE"
+    row["Tax Type"] = "Non-Taxable" if is_non_taxable else "Taxable"
+    row["Round Off"] = "Yes"
+    return tuple(row.values())
+
+
+# Constant row templates, built once at import
+_TAXABLE_TEMPLATE = _row_template(False)
+_NONTAXABLE_TEMPLATE = _row_template(True)
+
+# Positions of the per-invoice columns, in the order _build_row supplies them
+_VARIABLE_COLS = tuple(CSV_HEADERS.index(h) for h in (
+    "Entry Date", "Posting Date", "Organization", "Organization Branch",
+    "Vendor Inv No", "Vendor Inv Date", "Currency", "Narration", "Due Date",
+    "Charge or GL", "Charge or GL Name", "Charge or GL Amount", "DR or CR",
+    "Branch", "TaxGroup", "SAC or HSN",
+    "Taxcode1", "Taxcode1 Amt", "Taxcode2", "Taxcode2 Amt",
+    "Avail Tax Credit", "Amount",
+))
+
+
+def _build_row(
+    invoice: InvoiceData,
+    entry_date: str,
+    is_non_taxable: bool,
+    amount: float,
+    branch: str,
+    organization: str,
+    org_branch: str,
+    dr_cr: str,
+    narration: str,
+    taxcode1: str,
+    taxcode1_amt: str,
+    taxcode2: str,
+    taxcode2_amt: str,
+    expense_head: str,
+    sac_code: str,
+) -> tuple:
+    """Assemble a CSV row as a tuple in CSV_HEADERS order."""
+    has_tax = invoice.igst_amount > 0 or invoice.cgst_amount > 0 or invoice.sgst_amount > 0
+    row = list(_NONTAXABLE_TEMPLATE if is_non_taxable else _TAXABLE_TEMPLATE)
+    values = (
+        entry_date,
+        entry_date,
+        organization,
+        org_branch,
+        invoice.invoice_number,
+        invoice.invoice_date,
+        invoice.currency,
+        narration,
+        entry_date,
+        expense_head,
+        expense_head,
+        str(amount),
+        dr_cr,
+        branch,
+        "GSTIN" if invoice.customer_gstin and not is_non_taxable else "",
+        sac_code if not is_non_taxable else "",  # Air Transport, taxable only
+        taxcode1,
+        taxcode1_amt,
+        taxcode2,
+        taxcode2_amt,
+        "100" if has_tax else "Yes",
+        # Grand total for the invoice
+        str(invoice.taxable_value + invoice.non_taxable_value + invoice.igst_amount + invoice.cgst_amount + invoice.sgst_amount),
+    )
+    for col, value in zip(_VARIABLE_COLS, values):
+        row[col] = value
+    return tuple(row)
+
+
+def invoice_to_csv_tuple(
     invoice: InvoiceData, 
-    entry_date: Optional[str] = None,
+    entry_date: str,
     is_non_taxable: bool = False,
     charge_amount: Optional[float] = None
-) -> Dict[str, Any]:
-    """Convert InvoiceData to a CSV row dictionary.
+) -> tuple:
+    """Convert InvoiceData to a CSV row tuple (values in CSV_HEADERS order).
     
     Args:
         invoice: InvoiceData object
-        entry_date: Entry date in DD-MMM-YYYY format
+        entry_date: Entry date in DD-MMM-YYYY format (computed once per batch by the caller)
         is_non_taxable: If True, creates a non-taxable entry (for airport charges)
         charge_amount: Override for charge amount (used for split entries)
     """
     
-    if entry_date is None:
-        entry_date = get_current_date_formatted()
-    
-    # Determine Branch (Customer GSTIN based)
-    branch = ""
-    if invoice.customer_gstin:
-        branch = CUSTOMER_GSTIN_MAP.get(invoice.customer_gstin)
-        if not branch:
-            # Fallback to state code map
-            state_code = invoice.customer_gstin[:2]
-            branch = STATE_TO_BRANCH.get(state_code, "")
-            
+    # Determine Branch (Customer GSTIN based, then extracted state code)
+    branch = _customer_branch(invoice.customer_gstin)
     if not branch and invoice.state_code:
         branch = STATE_TO_BRANCH.get(invoice.state_code, "GUJARAT")
-    if not branch:
-        branch = "GUJARAT"
+    branch = branch or "GUJARAT"
 
     # Determine Organization Branch (Vendor GSTIN based)
-    org_branch = ""
-    if invoice.vendor_gstin:
-        org_branch = VENDOR_GSTIN_MAP.get(invoice.vendor_gstin)
-        if not org_branch:
-             # Fallback to state logic if extracted
-             state_code = invoice.vendor_gstin[:2]
-             org_branch = STATE_TO_BRANCH.get(state_code, "")
+    org_branch = _vendor_branch(invoice.vendor_gstin)
     
     # Determine DR or CR based on invoice type
     # Since Credit Notes are filtered out, both Tax Invoices and Debit Notes are Dr entries
     dr_cr = "Dr"
     
     # Generate narration
-    narration = generate_narration(
-        invoice.airline,
+    organization = map_airline_to_organization(invoice.airline)
+    narration = _build_narration(
+        organization,
         invoice.routing,
         invoice.pnr,
         invoice.passenger_name
@@ -1055,8 +1473,6 @@ def invoice_to_csv_row(
     taxcode1_amt = ""
     taxcode2 = ""
     taxcode2_amt = ""
-    taxcode3 = ""
-    taxcode3_amt = ""
     
     if not is_non_taxable:
         if invoice.igst_amount > 0:
@@ -1082,57 +1498,30 @@ def invoice_to_csv_row(
         expense_head = "TRAVELLING EXP. (AIRLINE MISC CHARGES)"
         sac_code = "996429"
 
-    # Build the row
-    row = {
-        "Entry Date": entry_date,
-        "Posting Date": entry_date,
-        "Organization": map_airline_to_organization(invoice.airline),
-        "Organization Branch": org_branch,
-        "Vendor Inv No": invoice.invoice_number,
-        "Vendor Inv Date": invoice.invoice_date,
-        "Currency": invoice.currency,
-        "ExchRate": "1",
-        "Narration": narration,
-        "Due Date": entry_date,
-        "Charge or GL": expense_head,
-        "Charge or GL Name": expense_head,
-        "Charge or GL Amount": str(amount),
-        "DR or CR": dr_cr,
-        "Cost Center": "",
-        "Branch": branch,
-        " Charge Narration": "AIRPORT CHARGES" if is_non_taxable else "BASE FARE",
-        "TaxGroup": "GSTIN" if invoice.customer_gstin and not is_non_taxable else "",
-        "Tax Type": "Non-Taxable" if is_non_taxable else "Taxable",
-        "SAC or HSN": sac_code if not is_non_taxable else "",  # Air Transport SAC code only for taxable
-        "Taxcode1": taxcode1,
-        "Taxcode1 Amt": taxcode1_amt,
-        "Taxcode2": taxcode2,
-        "Taxcode2 Amt": taxcode2_amt,
-        "Taxcode3": taxcode3,
-        "Taxcode3 Amt": taxcode3_amt,
-        "Taxcode4": "",
-        "Taxcode4 Amt": "",
-        "Avail Tax Credit": "100" if (invoice.igst_amount > 0 or invoice.cgst_amount > 0 or invoice.sgst_amount > 0) else "Yes",
-        "LOB": "",
-        "Ref Type": "",
-        "Ref No": "",
-        "Amount": str(invoice.taxable_value + invoice.non_taxable_value + invoice.igst_amount + invoice.cgst_amount + invoice.sgst_amount),  # Grand total for the invoice
-        "Start Date": "",
-        "End Date": "",
-        "WH Tax Code": "",
-        "WH Tax Percentage": "",
-        "WH Tax Taxable": "",
-        "WH Tax Amount": "",
-        "Round Off": "Yes",
-        "CC Code": "",
-    }
+    return _build_row(
+        invoice, entry_date, is_non_taxable, amount, branch, organization, org_branch, dr_cr,
+        narration, taxcode1, taxcode1_amt, taxcode2, taxcode2_amt, expense_head, sac_code
+    )
+
+
+def invoice_to_csv_row(
+    invoice: InvoiceData, 
+    entry_date: Optional[str] = None,
+    is_non_taxable: bool = False,
+    charge_amount: Optional[float] = None
+) -> Dict[str, Any]:
+    """Convert InvoiceData to a CSV row dictionary keyed by CSV_HEADERS.
     
-    return row
+    Thin wrapper around invoice_to_csv_tuple for callers that want named columns.
+    """
+    if entry_date is None:
+        entry_date = get_current_date_formatted()
+    return dict(zip(CSV_HEADERS, invoice_to_csv_tuple(invoice, entry_date, is_non_taxable, charge_amount)))
 
 
-def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+def invoice_to_csv_tuples(invoice: InvoiceData, entry_date: str) -> List[tuple]:
     """
-    Convert InvoiceData to one or more CSV row dictionaries.
+    Convert InvoiceData to one or more CSV row tuples.
     Creates separate rows for taxable and non-taxable amounts (e.g., Akasa airport charges).
     
     Args:
@@ -1140,31 +1529,45 @@ def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None)
         entry_date: Entry date in DD-MMM-YYYY format
         
     Returns:
-        List of row dictionaries
+        List of row tuples in CSV_HEADERS order
     """
-    if entry_date is None:
-        entry_date = get_current_date_formatted()
-    
     rows = []
     
     # Main taxable entry
     if invoice.taxable_value > 0:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     elif invoice.total_amount > 0 and invoice.non_taxable_value == 0:
         # No taxable value but has total - use total as taxable
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     
     # Non-taxable entry (airport charges, etc.) - separate row with same invoice number
     if invoice.non_taxable_value > 0:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=True))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=True))
     
     # If no rows created (edge case), create at least one
     if not rows:
-        rows.append(invoice_to_csv_row(invoice, entry_date, is_non_taxable=False))
+        rows.append(invoice_to_csv_tuple(invoice, entry_date, is_non_taxable=False))
     
     return rows
 
 
+def invoice_to_csv_rows(invoice: InvoiceData, entry_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Convert InvoiceData to one or more CSV row dictionaries.
+    Dict-based counterpart of invoice_to_csv_tuples.
+    
+    Args:
+        invoice: InvoiceData object
+        entry_date: Entry date in DD-MMM-YYYY format
+        
+    Returns:
+        List of row dictionaries
+    """
+    if entry_date is None:
+        entry_date = get_current_date_formatted()
+    return [dict(zip(CSV_HEADERS, row)) for row in invoice_to_csv_tuples(invoice, entry_date)]
+
+
 def generate_summary_report(
     summary_data: List[Dict[str, Any]],
     output_dir: str
@@ -1196,13 +1599,120 @@ def generate_summary_report(
 
 def group_invoices_by_gstin(invoices: List[InvoiceData]) -> Dict[str, List[InvoiceData]]:
     """Group invoices by customer GSTIN for separate output files."""
-    groups = {}
+    groups = defaultdict(list)
     for inv in invoices:
-        key = inv.customer_gstin if inv.customer_gstin else "UNKNOWN"
-        if key not in groups:
-            groups[key] = []
-        groups[key].append(inv)
-    return groups
+        groups[inv.customer_gstin or "UNKNOWN"].append(inv)
+    # Plain dict so lookups of missing GSTINs don't silently add empty groups
+    return dict(groups)
+
+
+def _group_filename(gstin: str, timestamp: str) -> str:
+    """Output filename for one customer-GSTIN group."""
+    # Get state name for filename
+    if gstin != "UNKNOWN" and gstin != "all" and len(gstin) >= 2:
+        state = STATE_TO_BRANCH.get(gstin[:2], "Unknown")
+    else:
+        state = "Unknown"
+    
+    gstin_suffix = gstin[-4:] if len(gstin) >= 4 else gstin
+    
+    # Format: Flight_Exp_Maharashtra_J1Z4_14FEB.csv
+    state_clean = state.replace(" ", "")
+    return f"Flight_Exp_{state_clean}_{gstin_suffix}_{timestamp}.csv"
+
+
+def _summary_entry(inv: InvoiceData, inv_rows: List[tuple]) -> Optional[Dict[str, Any]]:
+    """Validation summary entry for a written invoice, checked on its first (representative) row."""
+    if not inv_rows:
+        return None
+    
+    # Validation Logic for Summary
+    file_basename = inv.filename if inv.filename else "Unknown"
+    
+    status = "Success"
+    issues = []
+    
+    first_row = inv_rows[0]
+    org_branch = first_row[_ORG_BRANCH_COL]
+    cust_branch = first_row[_BRANCH_COL]
+    
+    # Check 1: Org Branch Empty
+    if not org_branch:
+        status = "Warning"
+        issues.append("Org Branch Empty")
+    
+    # Check 2: Vendor Mapping
+    in_map = "Yes"
+    if inv.vendor_gstin and inv.vendor_gstin not in VENDOR_GSTIN_MAP:
+        in_map = "No"
+        if status != "Warning": status = "Warning" # Downgrade if not already
+        issues.append("Vendor GSTIN not in Map (State Fallback used)")
+    
+    # Check 3: Cust Branch
+    if not cust_branch:
+        status = "Warning"
+        issues.append("Customer Branch Empty")
+
+    return {
+        "Status": status,
+        "Issues": "; ".join(issues),
+        "File Name": file_basename,
+        "Invoice No": inv.invoice_number,
+        "Airline": inv.airline,
+        "Vendor GSTIN": inv.vendor_gstin,
+        "Mapped Org Branch": org_branch,
+        "In Vendor Map?": in_map,
+        "Customer GSTIN": inv.customer_gstin,
+        "Mapped Cust Branch": cust_branch,
+        "Amount": first_row[_AMOUNT_COL]
+    }
+
+
+def _failed_summary_entry(inv: InvoiceData) -> Dict[str, Any]:
+    """Validation summary entry for a failed extraction (no CSV rows written)."""
+    return {
+        "Status": "Failed",
+        "Issues": "; ".join(inv.extraction_errors),
+        "File Name": inv.filename if inv.filename else "Unknown",
+        "Invoice No": inv.invoice_number or "N/A",
+        "Airline": inv.airline,
+        "Vendor GSTIN": inv.vendor_gstin,
+        "Mapped Org Branch": "N/A",
+        "In Vendor Map?": "N/A",
+        "Customer GSTIN": inv.customer_gstin,
+        "Mapped Cust Branch": "N/A",
+        "Amount": str(inv.total_amount)
+    }
+
+
+def _write_group_csv(
+    gstin: str,
+    inv_list: List[InvoiceData],
+    output_dir: str,
+    entry_date: str,
+    timestamp: str
+) -> tuple:
+    """Write one customer-GSTIN group to its own CSV file.
+    
+    Returns (filepath, summary entry per invoice in inv_list, None where there is none).
+    """
+    summary_data = []
+    filepath = os.path.join(output_dir, _group_filename(gstin, timestamp))
+    
+    # Write CSV
+    with open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        
+        rows = []
+        for inv in inv_list:
+            # Get mapped rows
+            inv_rows = invoice_to_csv_tuples(inv, entry_date)
+            summary_data.append(_summary_entry(inv, inv_rows))
+            rows.extend(inv_rows)
+        writer.writerows(rows)
+    
+    return filepath, summary_data
 
 
 def generate_csv(
@@ -1225,108 +1735,48 @@ def generate_csv(
     """
     os.makedirs(output_dir, exist_ok=True)
     generated_files = []
+    summary_data = [] # Collect data for validation report
     
-    if group_by_gstin:
-        groups = group_invoices_by_gstin(invoices)
-    else:
-        groups = {"all": invoices}
+    # Skip failed extractions before grouping. They get no CSV rows but keep their
+    # place in the summary, which lists each group's invoices in input order.
+    groups = defaultdict(list)  # group key -> invoices to write
+    positions = defaultdict(list)  # group key -> input position of each of those invoices
+    failed = defaultdict(list)  # group key -> [(input position, summary entry)]
+    group_keys = {}  # every group key, in order of first appearance
+    for pos, inv in enumerate(invoices):
+        key = (inv.customer_gstin or "UNKNOWN") if group_by_gstin else "all"
+        group_keys.setdefault(key, None)
+        if inv.invoice_number or not inv.extraction_errors:
+            groups[key].append(inv)
+            positions[key].append(pos)
+        else:
+            failed[key].append((pos, _failed_summary_entry(inv)))
     
     entry_date = get_current_date_formatted()
-    
-    summary_data = [] # Collect data for validation report
-
-    for gstin, inv_list in groups.items():
-        # Get state name for filename
-        if gstin != "UNKNOWN" and gstin != "all" and len(gstin) >= 2:
-            state = STATE_TO_BRANCH.get(gstin[:2], "Unknown")
-        else:
-            state = "Unknown"
-        
-        # Create filename with timestamp to avoid overwriting
-        timestamp = datetime.now().strftime("%d%b").upper() # 14FEB
-        gstin_suffix = gstin[-4:] if len(gstin) >= 4 else gstin
-        
-        # Format: Flight_Exp_Maharashtra_J1Z4_14FEB.csv
-        state_clean = state.replace(" ", "")
-        filename = f"Flight_Exp_{state_clean}_{gstin_suffix}_{timestamp}.csv"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Write CSV
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-            writer.writeheader()
-            
-            for inv in inv_list:
-                # Validation Logic for Summary
-                file_basename = inv.filename if inv.filename else "Unknown"
-                
-                status = "Success"
-                issues = []
-                
-                if inv.extraction_errors and not inv.invoice_number:
-                    status = "Failed"
-                    issues = "; ".join(inv.extraction_errors)
-                    # Add to summary even if skipped
-                    summary_data.append({
-                        "Status": status,
-                        "Issues": issues,
-                        "File Name": file_basename,
-                        "Invoice No": inv.invoice_number or "N/A",
-                        "Airline": inv.airline,
-                        "Vendor GSTIN": inv.vendor_gstin,
-                        "Mapped Org Branch": "N/A",
-                        "In Vendor Map?": "N/A",
-                        "Customer GSTIN": inv.customer_gstin,
-                        "Mapped Cust Branch": "N/A",
-                        "Amount": str(inv.total_amount)
-                    })
-                    continue  # Skip failed extractions
-                
-                # Get mapped rows
-                rows = invoice_to_csv_rows(inv, entry_date)
-                
-                # Check mapping for the first row (representative)
-                if rows:
-                    first_row = rows[0]
-                    org_branch = first_row.get("Organization Branch", "")
-                    cust_branch = first_row.get("Branch", "")
-                    
-                    # Check 1: Org Branch Empty
-                    if not org_branch:
-                        status = "Warning"
-                        issues.append("Org Branch Empty")
-                    
-                    # Check 2: Vendor Mapping
-                    in_map = "Yes"
-                    if inv.vendor_gstin and inv.vendor_gstin not in VENDOR_GSTIN_MAP:
-                        in_map = "No"
-                        if status != "Warning": status = "Warning" # Downgrade if not already
-                        issues.append("Vendor GSTIN not in Map (State Fallback used)")
-                    
-                    # Check 3: Cust Branch
-                    if not cust_branch:
-                        status = "Warning"
-                        issues.append("Customer Branch Empty")
-
-                    summary_data.append({
-                        "Status": status,
-                        "Issues": "; ".join(issues),
-                        "File Name": file_basename,
-                        "Invoice No": inv.invoice_number,
-                        "Airline": inv.airline,
-                        "Vendor GSTIN": inv.vendor_gstin,
-                        "Mapped Org Branch": org_branch,
-                        "In Vendor Map?": in_map,
-                        "Customer GSTIN": inv.customer_gstin,
-                        "Mapped Cust Branch": cust_branch,
-                        "Amount": first_row.get("Amount", "0")
-                    })
-
-                for row in rows:
-                    writer.writerow(row)
-        
-        generated_files.append(filepath)
-        print(f"Generated: {filepath} ({len(inv_list)} invoice(s))")
+    # Shared by every file in the batch (day resolution: same-day runs reuse the names)
+    timestamp = datetime.now().strftime("%d%b").upper() # 14FEB
+    
+    # Group files are independent, so write them concurrently
+    group_summaries = {}
+    if groups:
+        with ThreadPoolExecutor(max_workers=min(CSV_WRITE_WORKERS, len(groups))) as pool:
+            results = list(pool.map(
+                lambda item: _write_group_csv(*item, output_dir, entry_date, timestamp),
+                groups.items()
+            ))
+        for (filepath, group_summary), (key, inv_list) in zip(results, groups.items()):
+            generated_files.append(filepath)
+            group_summaries[key] = group_summary
+            print(f"Generated: {filepath} ({len(inv_list)} invoice(s))")
+    
+    for key in group_keys:
+        entries = failed[key] + [
+            (pos, entry)
+            for pos, entry in zip(positions[key], group_summaries.get(key, ()))
+            if entry
+        ]
+        entries.sort(key=lambda item: item[0])
+        summary_data.extend(entry for _, entry in entries)
     
     # Generate Summary Report
     summary_path = generate_summary_report(summary_data, output_dir)
@@ -1336,6 +1786,80 @@ def generate_csv(
     return generated_files
 
 
+class StreamingCsvWriter:
+    """
+    Write invoices to per-GSTIN CSV files as they arrive.
+    
+    Streaming counterpart of generate_csv for callers that produce invoices one
+    at a time: each group's file is opened on its first invoice and rows are
+    written immediately, so parsed invoices don't have to be held until the end.
+    The validation summary report is written on close().
+    
+    Usage:
+        with StreamingCsvWriter(output_dir) as csv_writer:
+            for invoice in invoices:
+                csv_writer.write(invoice)
+        generated_files = csv_writer.close()
+    """
+    
+    def __init__(self, output_dir: str, group_by_gstin: bool = True):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.group_by_gstin = group_by_gstin
+        self.entry_date = get_current_date_formatted()
+        self.timestamp = datetime.now().strftime("%d%b").upper() # 14FEB
+        self._groups = {}  # group key -> [file, csv writer, path, invoice count]
+        # group key -> summary entries, so the report lists each group together like generate_csv
+        self._summary_by_group: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._generated_files: List[str] = []
+    
+    def write(self, invoice: InvoiceData) -> None:
+        """Append one invoice's rows to its group file."""
+        key = (invoice.customer_gstin or "UNKNOWN") if self.group_by_gstin else "all"
+        if invoice.extraction_errors and not invoice.invoice_number:
+            self._summary_by_group[key].append(_failed_summary_entry(invoice))
+            return  # Skip failed extractions
+        
+        group = self._groups.get(key)
+        if group is None:
+            filepath = os.path.join(self.output_dir, _group_filename(key, self.timestamp))
+            f = open(filepath, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER)
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADERS)
+            group = self._groups[key] = [f, writer, filepath, 0]
+        
+        inv_rows = invoice_to_csv_tuples(invoice, self.entry_date)
+        entry = _summary_entry(invoice, inv_rows)
+        if entry:
+            self._summary_by_group[key].append(entry)
+        group[1].writerows(inv_rows)
+        group[3] += 1
+    
+    def close(self) -> List[str]:
+        """Close all open files, write the summary report and return the paths (safe to call more than once)."""
+        for f, _, filepath, count in self._groups.values():
+            f.close()
+            self._generated_files.append(filepath)
+            print(f"Generated: {filepath} ({count} invoice(s))")
+        self._groups.clear()
+        
+        # Generate Summary Report, group by group in order of first appearance
+        summary_data = [entry for entries in self._summary_by_group.values() for entry in entries]
+        if summary_data:
+            summary_path = generate_summary_report(summary_data, self.output_dir)
+            if summary_path:
+                self._generated_files.append(summary_path)
+            self._summary_by_group.clear()
+        
+        return list(self._generated_files)
+    
+    def __enter__(self) -> "StreamingCsvWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 def generate_single_csv(
     invoices: List[InvoiceData],
     output_path: str
@@ -1353,17 +1877,18 @@ def generate_single_csv(
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     entry_date = get_current_date_formatted()
     
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writeheader()
+    # Skip failed extractions
+    invoices = [inv for inv in invoices if inv.invoice_number or not inv.extraction_errors]
+    
+    with open(output_path, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
         
+        rows = []
         for inv in invoices:
-            if inv.extraction_errors and not inv.invoice_number:
-                continue  # Skip failed extractions
             # Get all rows (may be multiple for taxable + non-taxable split)
-            rows = invoice_to_csv_rows(inv, entry_date)
-            for row in rows:
-                writer.writerow(row)
+            rows.extend(invoice_to_csv_tuples(inv, entry_date))
+        writer.writerows(rows)
     
     print(f"Generated: {output_path} ({len(invoices)} invoice(s))")
     return output_path
@@ -1382,8 +1907,12 @@ Tkinter-based GUI for parsing airline invoices and generating Logisys CSV files.
 import os
 import sys
 import threading
-import queue
+import time
+from collections import deque
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from tkinter import (
     Tk, Frame, Label, Button, Entry, Text, Scrollbar, Canvas,
@@ -1412,9 +1941,13 @@ TEXT_SECONDARY = "#6B7280" # Muted Gray
 BORDER_COLOR = "#E5E7EB" # Border Gray
 SUCCESS_GREEN = "#1F3F6E" # Blue for success (Brand Rule)
 ERROR_RED = "#D8232A"     # Nagarkot Red for errors
+WARNING_ORANGE = "#E65100"
 LOG_BG = "#FAFBFC"
 LOG_FG = "#1E1E1E"
 
+# Log widget keeps at most this many lines; older ones are dropped
+MAX_LOG_LINES = 5000
+
 
 class LogRedirector:
     """Redirect print statements to the GUI log."""
@@ -1422,12 +1955,22 @@ class LogRedirector:
     def __init__(self, text_widget, queue):
         self.text_widget = text_widget
         self.queue = queue
+        self._buf = []  # Partial line waiting for its newline
     
     def write(self, message):
-        self.queue.put(message)
+        self._buf.append(message)
+        if "\n" not in message:
+            return
+        # Enqueue complete lines only; print() emits several fragments per line
+        *lines, tail = "".join(self._buf).split("\n")
+        self._buf = [tail] if tail else []
+        for line in lines:
+            self.queue.append((line, None))
     
     def flush(self):
-        pass
+        if self._buf:
+            self.queue.append(("".join(self._buf), None))
+            self._buf = []
 
 
 def resource_path(relative_path):
@@ -1442,6 +1985,34 @@ def resource_path(relative_path):
 
 
 
+# Last formatted log timestamp, keyed by whole epoch second
+_TS_CACHE = [0, ""]
+
+
+def _log_timestamp() -> str:
+    """HH:MM:SS for the current second; strftime runs at most once per second."""
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[0] = now
+        _TS_CACHE[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _TS_CACHE[1]
+
+
+@lru_cache(maxsize=1)
+def _load_logo_photo(path: str, height: int = 40):
+    """Decode and resize the header logo once per process; returns None if unavailable."""
+    if not HAS_PIL or not os.path.isfile(path):
+        return None
+    try:
+        img = Image.open(path)
+        # scale to the given height keeping aspect ratio
+        width = int(img.width * height / img.height)
+        resample = getattr(Image, "Resampling", Image).LANCZOS  # Pillow >= 9.1 moved the enum
+        return ImageTk.PhotoImage(img.resize((width, height), resample))
+    except Exception:
+        return None
+
+
 class InvoiceParserApp:
     """Main application class for the Invoice Parser GUI."""
     
@@ -1459,7 +2030,7 @@ class InvoiceParserApp:
         self.output_dir = StringVar(value=os.getcwd())
         self.group_by_gstin = BooleanVar(value=True)
         self.is_processing = False
-        self.log_queue = queue.Queue()
+        self.log_queue = deque()  # (message, tag) pairs; append/popleft are thread-safe
         
         # Configure ttk styles
         self._setup_styles()
@@ -1471,6 +2042,10 @@ class InvoiceParserApp:
     def _setup_styles(self):
         """Configure modern ttk styles."""
         style = ttk.Style()
+        # Styles live in the Tk interpreter, so a second window on the same
+        # root already has them; re-configuring would re-theme every widget.
+        if style.lookup("Accent.TButton", "background") == ACCENT:
+            return
         try:
             style.theme_use("clam")
         except Exception:
@@ -1556,17 +2131,7 @@ class InvoiceParserApp:
         # Logo (Left)
         # Use resource_path for PyInstaller compatibility
         logo_path = resource_path("logo.png")
-        self._logo_image = None
-        if HAS_PIL and os.path.isfile(logo_path):
-            try:
-                img = Image.open(logo_path)
-                # Fixed height: 20 units (Workflow Rule)
-                h = 40
-                w = int(img.width * h / img.height)
-                img = img.resize((w, h), Image.LANCZOS)
-                self._logo_image = ImageTk.PhotoImage(img)
-            except Exception:
-                pass
+        self._logo_image = _load_logo_photo(logo_path)
 
         if self._logo_image:
             logo_label = Label(header_frame, image=self._logo_image, bg=CARD_BG)
@@ -1639,7 +2204,7 @@ class InvoiceParserApp:
         self.process_btn.pack(side=LEFT, padx=(0, 20))
 
         self.progress = ttk.Progressbar(
-            action_frame, mode="indeterminate", length=300,
+            action_frame, mode="determinate", maximum=100, length=300,
             style="blue.Horizontal.TProgressbar",
         )
         self.progress.pack(side=LEFT, padx=(0, 15))
@@ -1689,34 +2254,41 @@ class InvoiceParserApp:
         clear_log_btn.pack(side=RIGHT)
     
     def _log(self, message: str, tag: str = None):
-        """Add a message to the log text widget (Thread-safe)."""
-        self.root.after(0, lambda: self._log_internal(message, tag))
-
-    def _log_internal(self, message: str, tag: str = None):
-        """Internal method to update log widget in main thread."""
+        """Queue a message for the log widget (Thread-safe)."""
+        self.log_queue.append((message, tag))
+    
+    def _start_log_polling(self):
+        """Poll the log queue and flush all pending messages in a single insert."""
+        timestamp = None
+        chunks = []
+        while self.log_queue:
+            message, tag = self.log_queue.popleft()
+            message = message.strip()
+            if not message:
+                continue
+            if timestamp is None:
+                timestamp = _log_timestamp()
+            chunks.extend((f"[{timestamp}] {message}\n", tag or ()))
+        if chunks:
+            self._write_log(chunks)
+        self.root.after(100, self._start_log_polling)
+    
+    def _write_log(self, chunks: list):
+        """Insert alternating (text, tags) chunks into the log widget (main thread only)."""
+        # Only follow the tail if the user hasn't scrolled up
+        at_bottom = self.log_text.yview()[1] >= 1.0
         self.log_text.configure(state="normal")
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted = f"[{timestamp}] {message}\n"
+        self.log_text.insert(END, *chunks)
         
-        if tag:
-            self.log_text.insert(END, formatted, tag)
-        else:
-            self.log_text.insert(END, formatted)
+        # Keep the widget bounded; drop the oldest lines in one delete
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - MAX_LOG_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         
-        self.log_text.see(END)
+        if at_bottom:
+            self.log_text.see(END)
         self.log_text.configure(state="disabled")
     
-    def _start_log_polling(self):
-        """Poll the log queue and update the text widget."""
-        try:
-            while True:
-                message = self.log_queue.get_nowait()
-                if message.strip():
-                    self._log(message.strip())
-        except queue.Empty:
-            pass
-        self.root.after(100, self._start_log_polling)
-    
     def _select_files(self):
         """Open file dialog to select PDF files."""
         files = filedialog.askopenfilenames(
@@ -1749,90 +2321,114 @@ class InvoiceParserApp:
     def _start_processing(self):
         """Start processing invoices in a background thread."""
         if not self.selected_files:
-            messagebox.showwarning("No Files", "Please select at least one PDF file.")
+            self._flash_status("Select at least one PDF", ERROR_RED)
             return
         
         if self.is_processing:
             return
         
+        # Ask where to save before starting, so the worker thread never touches Tk
+        output_dir = filedialog.askdirectory(
+            title="Select Output Directory for CSV",
+            initialdir=os.getcwd(),
+        )
+        if not output_dir:
+            self._log("CSV generation cancelled by user.", "warning")
+            self._flash_status("Cancelled", WARNING_ORANGE)
+            return
+        self.output_dir.set(output_dir)
+        
         self.is_processing = True
         self.process_btn.configure(state="disabled")
-        self.progress.start(10)
+        # Determinate bar: advanced once per parsed file instead of animating every 10 ms
+        self.progress.configure(maximum=len(self.selected_files), value=0)
         self.status_label.configure(text="Processing...", fg=ACCENT)
         
         # Start background thread
-        thread = threading.Thread(target=self._process_invoices, daemon=True)
+        thread = threading.Thread(
+            target=self._process_invoices,
+            args=(output_dir, self.group_by_gstin.get()),
+            daemon=True,
+        )
         thread.start()
     
-    def _process_invoices(self):
+    def _process_invoices(self, output_dir: str, group_by_gstin: bool):
         """Process all selected invoices (runs in background thread)."""
         try:
-            parsed_invoices: List[InvoiceData] = []
             total = len(self.selected_files)
             success_count = 0
             failed_count = 0
             
             self._log(f"Starting to process {total} file(s)...", "info")
             
-            for i, pdf_path in enumerate(self.selected_files, 1):
-                filename = os.path.basename(pdf_path)
-                
-                try:
-                    self._log(f"[{i}/{total}] Parsing: {filename}")
-                    invoice = parse_invoice(pdf_path)
-                    
-                    if invoice.invoice_number:
-                        parsed_invoices.append(invoice)
-                        self._log(f"  ✓ {invoice.airline}: {invoice.invoice_number} | Total: ₹{invoice.total_amount}", "success")
-                        success_count += 1
-                    else:
-                        errors = ", ".join(invoice.extraction_errors) if invoice.extraction_errors else "Unknown error"
-                        self._log(f"  ✗ Failed: {errors}", "error")
-                        failed_count += 1
-                        
-                except Exception as e:
-                    self._log(f"  ✗ Error processing {filename}: {str(e)}", "error")
+            # Reject non-PDFs (possible via the "All files" filter) before starting workers
+            basenames = [os.path.basename(p) for p in self.selected_files]
+            pdf_indices = []
+            for index, pdf_path in enumerate(self.selected_files):
+                if is_pdf_file(pdf_path):
+                    pdf_indices.append(index)
+                else:
+                    self._log(f"  ✗ Not a PDF: {basenames[index]}", "error")
                     failed_count += 1
             
-            # Generate CSV
-            if parsed_invoices:
-                self._log(f"\nGenerating CSV file(s)...", "info")
-
-                # Ask user where to save
-                output_dir = filedialog.askdirectory(
-                    title="Select Output Directory for CSV",
-                    initialdir=os.getcwd(),
-                )
-                if not output_dir:
-                    self._log("CSV generation cancelled by user.", "warning")
-                    return
-
-                self.output_dir.set(output_dir)
-                
-                try:
-                    generated_files = generate_csv(
-                        parsed_invoices,
-                        output_dir,
-                        group_by_gstin=self.group_by_gstin.get()
-                    )
+            # Parse in worker processes; results are logged as they complete but
+            # written to CSV in selection order, so the same selection gives the same files
+            workers = max(1, min(os.cpu_count() or 1, len(pdf_indices)))
+            csv_writer = StreamingCsvWriter(output_dir, group_by_gstin=group_by_gstin)
+            with csv_writer, ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(parse_invoice, self.selected_files[index]): pos
+                    for pos, index in enumerate(pdf_indices)
+                }
+                ready = {}  # Finished ahead of an earlier file: position -> invoice (None if failed)
+                next_pos = 0
+                # Rejected files count towards progress
+                for i, future in enumerate(as_completed(futures), failed_count + 1):
+                    self.root.after(0, lambda done=i: self.progress.configure(value=done))
+                    pos = futures[future]
+                    filename = basenames[pdf_indices[pos]]
+                    invoice = None
                     
-                    self._log(f"Successfully generated {len(generated_files)} file(s).", "success")
-                    has_summary = any("Processing_Summary" in f for f in generated_files)
-                    
-                    for f in generated_files:
-                        if "Processing_Summary" in f:
-                            self._log(f"  ⚠ Validation Report: {os.path.basename(f)}", "warning")
+                    try:
+                        invoice = future.result()
+                        self._log(f"[{i}/{total}] Parsed: {filename}")
+                        
+                        if invoice.invoice_number:
+                            self._log(f"  ✓ {invoice.airline}: {invoice.invoice_number} | Total: ₹{invoice.total_amount}", "success")
+                            success_count += 1
                         else:
-                            self._log(f"  - {os.path.basename(f)}", "success")
-                    
-                    if has_summary:
-                        self._log("Check the Validation Report for any missing mappings.", "info")
-                    
-                    self._log(f"\n✓ Complete! Processed {success_count}/{total} invoices.", "success")
-                    self._log(f"  Output directory: {output_dir}", "info")
+                            errors = ", ".join(invoice.extraction_errors) if invoice.extraction_errors else "Unknown error"
+                            self._log(f"  ✗ Failed: {errors}", "error")
+                            failed_count += 1
+                            invoice = None
+                            
+                    except Exception as e:
+                        self._log(f"  ✗ Error processing {filename}: {str(e)}", "error")
+                        failed_count += 1
                     
-                except Exception as e:
-                    self._log(f"  ✗ CSV generation error: {str(e)}", "error")
+                    ready[pos] = invoice
+                    while next_pos in ready:
+                        invoice = ready.pop(next_pos)
+                        if invoice is not None:
+                            csv_writer.write(invoice)
+                        next_pos += 1
+            
+            generated_files = csv_writer.close()
+            if success_count:
+                self._log(f"Successfully generated {len(generated_files)} file(s).", "success")
+                has_summary = any("Processing_Summary" in f for f in generated_files)
+                
+                for f in generated_files:
+                    if "Processing_Summary" in f:
+                        self._log(f"  ⚠ Validation Report: {os.path.basename(f)}", "warning")
+                    else:
+                        self._log(f"  - {os.path.basename(f)}", "success")
+                
+                if has_summary:
+                    self._log("Check the Validation Report for any missing mappings.", "info")
+                
+                self._log(f"\n✓ Complete! Processed {success_count}/{total} invoices.", "success")
+                self._log(f"  Output directory: {output_dir}", "info")
             else:
                 self._log("No invoices were successfully parsed.", "warning")
             
@@ -1846,16 +2442,28 @@ class InvoiceParserApp:
             # Update UI in main thread
             self.root.after(0, self._processing_complete)
     
+    def _flash_status(self, text: str, color: str, duration_ms: int = 3000):
+        """Show a transient status message instead of a blocking dialog."""
+        self.status_label.configure(text=text, fg=color)
+        
+        def _reset():
+            # Don't clobber a status set since (e.g. "Processing...")
+            if self.status_label.cget("text") == text:
+                self.status_label.configure(text="Ready", fg=TEXT_SECONDARY)
+        
+        self.root.after(duration_ms, _reset)
+    
     def _processing_complete(self):
         """Called when processing is complete."""
         self.is_processing = False
         self.process_btn.configure(state="normal")
-        self.progress.stop()
         self.status_label.configure(text="Complete", fg=SUCCESS_GREEN)
 
 
 def main():
     """Main entry point."""
+    # Needed for the parser worker processes in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     root = Tk()
     app = InvoiceParserApp(root)
     root.mainloop()
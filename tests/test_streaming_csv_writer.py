@@ -0,0 +1,73 @@
+"""
+StreamingCsvWriter (used by the GUI) must produce the same Processing_Summary
+as generate_csv for the same invoices.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from invoice_processor import InvoiceData, StreamingCsvWriter, generate_csv
+
+
+def _invoice(number: str, gstin: str) -> InvoiceData:
+    return InvoiceData(
+        airline="INDIGO",
+        invoice_number=number,
+        invoice_date="14-May-2025",
+        customer_gstin=gstin,
+        vendor_gstin="27AABCI2726B1Z8",
+        taxable_value=1000.0,
+        igst_amount=50.0,
+        total_amount=1050.0,
+        filename=f"{number}_IndiGo_TAX_INVOICE.pdf",
+    )
+
+
+def _failed(name: str, gstin: str = "") -> InvoiceData:
+    inv = InvoiceData(customer_gstin=gstin, filename=name)
+    inv.extraction_errors.append("Invoice number not found")
+    return inv
+
+
+def _summary_text(output_dir: str) -> str:
+    (name,) = [f for f in os.listdir(output_dir) if f.startswith("Processing_Summary")]
+    with open(os.path.join(output_dir, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class StreamingSummaryOrderTest(unittest.TestCase):
+    # Groups interleaved, with failures both inside a group and in a group of their own
+    INVOICES = [
+        _invoice("INV1", "27AACCN5739J1Z4"),
+        _invoice("INV2", "06AACCN5739J1Z8"),
+        _failed("bad1.pdf", "27AACCN5739J1Z4"),
+        _invoice("INV3", "27AACCN5739J1Z4"),
+        _failed("bad2.pdf"),
+        _invoice("INV4", "06AACCN5739J1Z8"),
+        _invoice("INV5", ""),
+    ]
+
+    def _compare(self, group_by_gstin: bool) -> None:
+        with tempfile.TemporaryDirectory() as batch_dir, tempfile.TemporaryDirectory() as stream_dir:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_csv(self.INVOICES, batch_dir, group_by_gstin=group_by_gstin)
+                with StreamingCsvWriter(stream_dir, group_by_gstin=group_by_gstin) as csv_writer:
+                    for invoice in self.INVOICES:
+                        csv_writer.write(invoice)
+            self.assertEqual(_summary_text(stream_dir), _summary_text(batch_dir))
+
+    def test_grouped_summary_matches_generate_csv(self):
+        self._compare(group_by_gstin=True)
+
+    def test_single_group_summary_matches_generate_csv(self):
+        self._compare(group_by_gstin=False)
+
+
+if __name__ == "__main__":
+    unittest.main()